@@ -1,19 +1,27 @@
+import os
+import time
+import threading
 import streamlit as st
 import pandas as pd
 
 # Importiere deine eigenen Module
-from src.extractors.crypto_api import get_crypto_data
-from src.extractors.fred_api import get_fred_data
-from src.extractors.weather_api import get_weather_data
-from src.extractors.exchange_api import get_exchange_rate_data
-from src.extractors.nasa_api import get_nasa_neo_data
-from src.extractors.news_analyzer import get_news_and_analyze # <--- NEU: Unsere KI
+from src.extractors.snapshots import SNAPSHOT_DAYS, SNAPSHOT_PATH, read_snapshot, run_forever
+from src.visualizers.plotter import unit_suffix
+from src.visualizers.downsample import downsample_series
+from src.analysis.trend_stats import trend_stats
+from src.analysis.correlation import correlation_report, most_interesting_pair, ROLLING_WINDOW
 
 # 1. Website-Setup
 st.set_page_config(page_title="DataZeitgeist Dashboard", page_icon="📊", layout="wide")
 st.title("📊 DataZeitgeist: Live Dashboard")
 st.markdown("Analysiere und korreliere globale Datenströme in Echtzeit.")
 
+# Größter wählbarer Zeitraum: so viele Tage hält der Snapshot vor, kürzere Zeiträume sind nur Ausschnitte davon
+MAX_DAYS = SNAPSHOT_DAYS
+
+# Ungefähre Breite eines halbseitigen Diagramms in Pixeln: mehr Punkte pro Linie schicken wir nicht an den Browser
+CHART_MAX_POINTS = 800
+
 # 2. Seitenleiste (Sidebar)
 st.sidebar.header("⚙️ Steuerung")
 
@@ -25,57 +33,120 @@ dataset_options = {
     "NASA Asteroiden": "nasa"
 }
 
-# Mapping für die KI-Suchanfragen
-ai_queries = {
-    "crypto": "Kryptowährung Bitcoin Markt",
-    "fred": "US Notenbank Zinsen Wirtschaft",
-    "exchange": "Euro Dollar Wechselkurs",
-    "weather": None, # Bei Wetter und NASA lassen wir die KI erstmal weg
-    "nasa": None
-}
-
 with st.sidebar.form("steuerung_form"):
-    days = st.slider("Zeitraum (Tage)", min_value=7, max_value=90, value=30, step=7)
+    days = st.slider("Zeitraum (Tage)", min_value=7, max_value=MAX_DAYS, value=30, step=7)
     
     st.subheader("Datenquellen vergleichen")
     ds1_name = st.selectbox("Datensatz 1", list(dataset_options.keys()), index=0)
     ds2_name = st.selectbox("Datensatz 2", list(dataset_options.keys()), index=1)
+    show_matrix = st.checkbox("Alle Quellen korrelieren (Heatmap)", value=True)
     
     submit_button = st.form_submit_button("Daten analysieren 🚀")
 
-# 3. Daten-Ladefunktionen (mit Caching!)
-@st.cache_data(ttl=3600)
-def load_data(source, days):
-    if source == "crypto": return get_crypto_data(coin_id="bitcoin", days=days)
-    elif source == "fred": return get_fred_data(series_id="DGS10", days=days)
-    elif source == "weather": return get_weather_data(city="Berlin", lat=52.52, lon=13.41, days=days)
-    elif source == "exchange": return get_exchange_rate_data(base="EUR", target="USD", days=days)
-    elif source == "nasa": return get_nasa_neo_data(days=days)
-    return None
-
-@st.cache_data(ttl=3600)
-def load_ai_analysis(query):
-    if not query: return None
-    return get_news_and_analyze(query, "de", test_mode=False)
+# 3. Daten-Ladefunktionen: nur lokales Lesen, die APIs fragt ausschließlich der Refresher ab
+@st.cache_resource
+def start_background_refresher():
+    """
+    Startet den Refresher einmal pro Server-Prozess (nicht pro Besucher), damit das Dashboard auch ohne
+    separaten Prozess (z.B. auf Streamlit Cloud) aktuell bleibt. Mit SNAPSHOT_REFRESHER=external läuft er
+    stattdessen eigenständig: python -m src.extractors.snapshots
+    """
+    if os.getenv("SNAPSHOT_REFRESHER") == "external":
+        return None
+    thread = threading.Thread(target=run_forever, daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_snapshot(modified):
+    """Liest den Snapshot; der Änderungszeitpunkt als Cache-Schlüssel sorgt dafür, dass neue Snapshots sofort ankommen."""
+    return read_snapshot()
+
+def current_snapshot(refresher, wait_seconds=60):
+    """Der aktuelle Snapshot. Beim allerersten Start warten wir kurz, bis der Refresher ihn geschrieben hat."""
+    deadline = time.monotonic() + wait_seconds
+    while not os.path.exists(SNAPSHOT_PATH) and refresher is not None and refresher.is_alive() and time.monotonic() < deadline:
+        time.sleep(1)
+    if not os.path.exists(SNAPSHOT_PATH):
+        return None
+    return load_snapshot(os.path.getmtime(SNAPSHOT_PATH))
+
+def load_data(snapshot, source, days):
+    """Die letzten `days` Tage einer Quelle, ausgeschnitten aus dem Snapshot (kein API-Call)."""
+    ts = snapshot.series.get(source)
+    return ts.tail(days) if ts is not None else None
+
+def show_ai_analysis(ai_text, title):
+    """Zeigt die vom Refresher vorbereitete KI-Analyse in einer Info-Box."""
+    ai_text = ai_text.strip().strip('"')
+    if ai_text:
+        st.info(f"**🤖 Llama-3.1 KI-Analyse zu '{title}':**\n\n{ai_text}")
+
+def describe_stats(row):
+    """Kurze Zusatzzeile unter einer Metrik: z-Score, aktuelle Serie und Abstand zum Hoch."""
+    parts = [f"z-Score {row['zscore']:+.1f}"]
+    if row["streak_days"] >= 2 and row["streak_direction"] != 0:
+        arrow = "↗️" if row["streak_direction"] > 0 else "↘️"
+        parts.append(f"{arrow} {int(row['streak_days'])}x in Folge")
+    if row["pct_from_high"] == 0:
+        parts.append("🏔️ Hoch im Zeitraum")
+    elif not pd.isna(row["pct_from_high"]):
+        parts.append(f"{row['pct_from_high']:.1f}% unter Hoch")
+    return " · ".join(parts)
+
+def show_correlation_section(datasets, ds1_name, ds2_name):
+    """Heatmap aller Quellen, dazu gleitende Korrelation und Vorlauf/Nachlauf des gewählten Paares."""
+    names = {source: name for name, source in dataset_options.items()}
+    report = correlation_report({names[source]: ts for source, ts in datasets.items()})
+    if report is None:
+        return
+
+    st.subheader("🧮 Korrelations-Matrix aller Datenquellen (Tagesänderungen)")
+    heat_col, detail_col = st.columns([3, 2])
+    with heat_col:
+        heatmap = report.matrix.style.background_gradient(cmap="RdBu_r", vmin=-1, vmax=1).format("{:.2f}", na_rep="–")
+        st.dataframe(heatmap, use_container_width=True)
+    with detail_col:
+        top = most_interesting_pair(report)
+        if top is not None:
+            lag_text = f"Vorlauf {int(top['best_lag']):+d} Tage: r = {top['lag_corr']:.2f}" if top["best_lag"] else "ohne Vorlauf"
+            st.metric(label="Auffälligstes Paar", value=f"{top['a']} ~ {top['b']}", delta=f"r = {top['corr']:.2f}, {lag_text}", delta_color="off")
+
+    # Details für das oben gewählte Paar (in der Matrix steht es in einer der beiden Reihenfolgen)
+    label = next((l for l in (f"{ds1_name} ~ {ds2_name}", f"{ds2_name} ~ {ds1_name}") if l in report.pairs.index), None)
+    if label is None:
+        return
+
+    roll_col, lag_col = st.columns(2)
+    with roll_col:
+        st.write(f"**Gleitende Korrelation ({ROLLING_WINDOW} Tage): {label}**")
+        st.line_chart(downsample_series(report.rolling[label].dropna(), CHART_MAX_POINTS), color="#1DA1F2")
+    with lag_col:
+        # Positive Verschiebung: der erste Datensatz läuft dem zweiten voraus
+        st.write(f"**Korrelation nach Verschiebung in Tagen: {label}**")
+        st.bar_chart(report.lags.loc[label], color="#FFD700")
 
 # 4. Magie: Ladebalken
 if submit_button or ('df_merged' not in st.session_state): # Lädt auch beim ersten Seitenaufruf
-    with st.spinner("Lade Live-Daten und KI-Analyse..."):
-        src1 = dataset_options[ds1_name]
-        src2 = dataset_options[ds2_name]
-        
-        df1 = load_data(src1, days)
-        df2 = load_data(src2, days)
-        
-        # KI Analyse für den ersten Datensatz abrufen (falls verfügbar)
-        ai_text = load_ai_analysis(ai_queries[src1])
+    src1 = dataset_options[ds1_name]
+    src2 = dataset_options[ds2_name]
+
+    # Alle Daten und KI-Texte kommen aus dem lokalen Snapshot, die Ladezeit hängt also an keiner API
+    with st.spinner("Lade Daten..."):
+        snapshot = current_snapshot(start_background_refresher())
+
+    if snapshot is None:
+        st.warning("⏳ Noch keine Daten vorhanden. Der Refresher erstellt gerade den ersten Snapshot, bitte gleich neu laden.")
+        st.stop()
+
+    st.caption(f"🕒 Datenstand: {snapshot.updated_at.astimezone():%d.%m.%Y %H:%M} Uhr")
+    datasets = {source: load_data(snapshot, source, days) for source in dataset_options.values()}
+    ts1, ts2 = datasets[src1], datasets[src2]
 
     # 5. Daten zusammenführen & KPIs berechnen
-    if df1 is not None and df2 is not None:
-        df1 = df1.rename(columns={'Aufrufe': ds1_name})
-        df2 = df2.rename(columns={'Aufrufe': ds2_name})
-        
-        df_merged = pd.merge(df1, df2, on='timestamp', how='inner').set_index('timestamp')
+    if ts1 is not None and ts2 is not None:
+        # Beide TimeSeries auf die gemeinsamen Tage legen (Index = Datum, eine Spalte pro Datensatz)
+        df_merged = ts1.align(ts2, ds1_name, ds2_name)
         
         st.markdown("---")
         
@@ -83,26 +154,20 @@ if submit_button or ('df_merged' not in st.session_state): # Lädt auch beim ers
         st.subheader("📈 Key Performance Indicators (Heute vs. Vorwoche)")
         kpi1, kpi2, kpi3 = st.columns(3)
         
-        # Werte berechnen (Aktuell vs vor 7 Tagen)
+        # Kennzahlen für beide Datensätze in einem Durchgang (Aktuell vs. vor 7 Tagen, z-Score, Serie, Abstand zum Hoch)
+        stats = trend_stats({ds1_name: ts1, ds2_name: ts2})
+
         if len(df_merged) >= 7:
-            val1_now = df_merged[ds1_name].iloc[-1]
-            val1_old = df_merged[ds1_name].iloc[-7]
-            delta1 = val1_now - val1_old
-            
-            val2_now = df_merged[ds2_name].iloc[-1]
-            val2_old = df_merged[ds2_name].iloc[-7]
-            delta2 = val2_now - val2_old
-            
             # Mathematische Korrelation (Pearson)
             correlation = df_merged[ds1_name].corr(df_merged[ds2_name])
             
-            with kpi1:
-                # Formatierung je nach Datentyp anpassen
-                format_str = "%.4f" if "Wechselkurs" in ds1_name else "%.2f"
-                st.metric(label=ds1_name, value=format_str % val1_now, delta=format_str % delta1)
-            with kpi2:
-                format_str = "%.4f" if "Wechselkurs" in ds2_name else "%.2f"
-                st.metric(label=ds2_name, value=format_str % val2_now, delta=format_str % delta2)
+            for kpi, name, ts in ((kpi1, ds1_name, ts1), (kpi2, ds2_name, ts2)):
+                row = stats.loc[name]
+                with kpi:
+                    # Formatierung je nach Datentyp anpassen
+                    format_str = "%.4f" if "Wechselkurs" in name else "%.2f"
+                    st.metric(label=name, value=format_str % row["last"] + unit_suffix(ts.unit), delta=format_str % row["change_7d"])
+                    st.caption(describe_stats(row))
             with kpi3:
                 # Interpretation der Korrelation
                 if correlation > 0.7: corr_text = "Stark Positiv 🟢"
@@ -119,14 +184,18 @@ if submit_button or ('df_merged' not in st.session_state): # Lädt auch beim ers
         col1, col2 = st.columns(2)
         with col1:
             st.write(f"**Verlauf: {ds1_name}**")
-            st.line_chart(df_merged[ds1_name], color="#1DA1F2") 
+            st.line_chart(downsample_series(df_merged[ds1_name], CHART_MAX_POINTS), color="#1DA1F2")
         with col2:
             st.write(f"**Verlauf: {ds2_name}**")
-            st.line_chart(df_merged[ds2_name], color="#FFD700")
+            st.line_chart(downsample_series(df_merged[ds2_name], CHART_MAX_POINTS), color="#FFD700")
+
+        # --- NEU: KORRELATIONS-MATRIX ALLER QUELLEN ---
+        if show_matrix:
+            st.markdown("---")
+            show_correlation_section(datasets, ds1_name, ds2_name)
 
-        # --- NEU: KI ANALYSE BEREICH ---
-        if ai_text:
-            st.info(f"**🤖 Llama-3.1 KI-Analyse zu '{ds1_name}':**\n\n{ai_text}")
+        # --- NEU: KI ANALYSE BEREICH (für den ersten Datensatz, falls verfügbar) ---
+        show_ai_analysis(snapshot.ai_texts.get(src1, ""), ds1_name)
 
         # Rohdaten
         with st.expander("Tabelle mit Rohdaten anzeigen"):
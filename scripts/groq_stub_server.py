@@ -0,0 +1,120 @@
+"""
+Lokaler Stub-Server, der sich wie die Groq- (OpenAI-kompatibel) und GNews-API verhält.
+Damit lassen sich Streaming, Latenz und Fehlerfälle offline testen, ohne Tokens oder Kontingent zu verbrauchen.
+
+Start:
+    python scripts/groq_stub_server.py --port 8765 --first-token-ms 800 --token-ms 60
+
+Bot bzw. Dashboard darauf umstellen:
+    GROQ_API_BASE=http://localhost:8765/openai/v1 GNEWS_API_BASE=http://localhost:8765/api/v4 \\
+    GROQ_API_KEY=stub GNEWS_API_KEY=stub streamlit run dashboard.py
+"""
+import re
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+ANSWER = "📈 Das Thema trendet, weil aktuelle Schlagzeilen viel Aufmerksamkeit erzeugen. Mehrere Medien berichten gleichzeitig darüber."
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Wird in main() aus den Kommandozeilen-Argumenten gesetzt
+    first_token_delay = 0.5
+    token_delay = 0.05
+    fail_rate = 0
+    request_count = 0
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if not url.path.endswith("/search"):
+            return self._send_json(404, {"errors": ["Not found"]})
+
+        query = parse_qs(url.query).get("q", [""])[0]
+        articles = [
+            {"title": f"Schlagzeile {i} zu {query}", "description": f"Kurzbeschreibung {i} zu {query}."}
+            for i in range(1, 4)
+        ]
+        self._send_json(200, {"totalArticles": len(articles), "articles": articles})
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "Not found"}})
+
+        StubHandler.request_count += 1
+        if self.fail_rate and StubHandler.request_count % self.fail_rate == 0:
+            return self._send_json(429, {"error": {"message": "Rate limit reached (Stub)"}})
+
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        prompt = payload.get("messages", [{}])[-1].get("content", "")
+
+        # Sammel-Anfrage (JSON-Modus): eine Antwort pro nummeriertem Thema
+        if (payload.get("response_format") or {}).get("type") == "json_object":
+            topics = re.findall(r"^Thema (\d+):", prompt, flags=re.MULTILINE)
+            text = json.dumps({n: f"{ANSWER} (Thema {n})" for n in topics}, ensure_ascii=False)
+        else:
+            text = ANSWER
+
+        time.sleep(self.first_token_delay)
+        if payload.get("stream"):
+            self._stream(payload, text)
+        else:
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion", "model": payload.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            })
+
+    def _stream(self, payload, text):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        # Wortweise senden, wie ein echtes Modell Token für Token
+        for i, word in enumerate(re.findall(r"\S+\s*", text)):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = {
+                "id": "stub", "object": "chat.completion.chunk", "model": payload.get("model"),
+                "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        print(f"🧪 Stub: {self.command} {self.path.split('?')[0]} -> {args[1] if len(args) > 1 else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Groq/GNews-Stub für Offline-Tests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-ms", type=int, default=500, help="Wartezeit bis zum ersten Token")
+    parser.add_argument("--token-ms", type=int, default=50, help="Wartezeit zwischen zwei Tokens")
+    parser.add_argument("--fail-every", type=int, default=0, help="Jede n-te Groq-Anfrage mit 429 beantworten")
+    args = parser.parse_args()
+
+    StubHandler.first_token_delay = args.first_token_ms / 1000
+    StubHandler.token_delay = args.token_ms / 1000
+    StubHandler.fail_rate = args.fail_every
+
+    server = ThreadingHTTPServer(("localhost", args.port), StubHandler)
+    print(f"🧪 Stub-Server läuft auf http://localhost:{args.port} (Groq: /openai/v1, GNews: /api/v4)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import warnings
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+from .trend_stats import stack_series, _forward_fill
+
+# Verschiebung in Tagen, bis zu der wir nach einem Vorlauf/Nachlauf suchen (±MAX_LAG)
+MAX_LAG = 7
+
+# Fensterlänge der gleitenden Korrelation in Tagen
+ROLLING_WINDOW = 14
+
+# Weniger gemeinsame Tage ergeben keine belastbare Korrelation
+MIN_OVERLAP = 10
+
+# Ab hier gilt ein Paar als auffällig genug, um es zu posten: Mindest-|r| der Tagesänderungen (gleichzeitig
+# oder versetzt) und Mindestzahl an Tagen, an denen BEIDE Reihen eine echte Änderung haben (nicht nur aufgefüllte)
+MIN_PAIR_CORR = 0.7
+MIN_OBSERVED_DAYS = 20
+
+# Ein Vorlauf braucht ein höheres |r|: Wer 2 * MAX_LAG + 1 Verschiebungen durchprobiert, findet
+# bei Zufallsdaten viel öfter eine, die zufällig gut passt
+MIN_LAG_CORR = 0.85
+
+# So viele Paare rechnet die FFT-Kreuzkorrelation auf einmal
+PAIR_BLOCK = 256
+
+@dataclass
+class CorrelationReport:
+    """
+    Ergebnis von correlation_report:
+    matrix  – Korrelationsmatrix (Name x Name),
+    pairs   – eine Zeile pro Paar (a, b) mit Korrelation, bestem Vorlauf, Anzahl echter gemeinsamer Messtage
+              und Bewertung, nach score sortiert,
+    rolling – gleitende Korrelation pro Paar (Zeilen = Tage, Spalten = "a ~ b"),
+    lags    – Korrelation pro Verschiebung (Zeilen = "a ~ b", Spalten = Verschiebung in Tagen).
+    """
+    matrix: pd.DataFrame
+    pairs: pd.DataFrame
+    rolling: pd.DataFrame
+    lags: pd.DataFrame
+
+def _standardize(matrix):
+    """z-Transformation pro Zeile (NaN bleiben NaN). Ändert keine Korrelation, hält aber die Summen klein und genau."""
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(matrix, axis=1, keepdims=True)
+        std = np.nanstd(matrix, axis=1, keepdims=True)
+    return (matrix - mean) / np.where(std > 0, std, 1)
+
+def _pearson(n, sx, sy, sxx, syy, sxy):
+    """Pearson-Korrelation aus Summen über die gemeinsamen Tage (funktioniert für Arrays beliebiger Form)."""
+    with np.errstate(all="ignore"):
+        cov = n * sxy - sx * sy
+        var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+        corr = cov / np.sqrt(var)
+    # Rundungsfehler (z.B. aus der FFT) dürfen nicht über ±1 hinausschießen
+    return np.where((n >= MIN_OVERLAP) & (var > 0), np.clip(corr, -1, 1), np.nan)
+
+def _pair_indices(count):
+    """Alle Paare (i, j) mit i < j als zwei Index-Arrays."""
+    return np.triu_indices(count, k=1)
+
+def correlation_matrix(matrix):
+    """
+    Korrelationsmatrix aller Zeilen auf einmal (Zeile = Zeitreihe, Spalte = Tag, fehlende Tage = NaN).
+    Jedes Paar nutzt nur die Tage, an denen beide Werte haben – berechnet mit Matrix-Produkten statt Schleifen.
+    """
+    z = _standardize(np.asarray(matrix, dtype="float64"))
+    mask = (~np.isnan(z)).astype("float64")
+    z0 = np.nan_to_num(z)
+
+    n = mask @ mask.T
+    sx = z0 @ mask.T           # sx[i, j] = Summe von i über die gemeinsamen Tage mit j
+    sxx = (z0 ** 2) @ mask.T
+    sxy = z0 @ z0.T
+
+    corr = _pearson(n, sx, sx.T, sxx, sxx.T, sxy)
+    np.fill_diagonal(corr, np.where(np.diag(n) >= MIN_OVERLAP, 1.0, np.nan))
+    return corr
+
+def rolling_correlations(matrix, window=ROLLING_WINDOW):
+    """
+    Gleitende Korrelation über `window` Tage für alle Paare gleichzeitig (über kumulierte Summen, O(Paare x Tage)).
+    Liefert (Paar-Indizes, Array Paare x Tage); ein Wert steht am letzten Tag seines Fensters,
+    Fenster mit weniger als MIN_OVERLAP gemeinsamen Tagen ergeben NaN.
+    """
+    z = _standardize(np.asarray(matrix, dtype="float64"))
+    i, j = _pair_indices(z.shape[0])
+    both = ~np.isnan(z[i]) & ~np.isnan(z[j])
+    x = np.where(both, z[i], 0)
+    y = np.where(both, z[j], 0)
+
+    def window_sum(values):
+        cumulative = np.cumsum(values, axis=1)
+        cumulative = np.concatenate([np.zeros((len(values), 1)), cumulative], axis=1)
+        return cumulative[:, window:] - cumulative[:, :-window]
+
+    n = window_sum(both.astype("float64"))
+    corr = _pearson(n, window_sum(x), window_sum(y), window_sum(x * x), window_sum(y * y), window_sum(x * y))
+
+    padding = np.full((len(corr), min(window - 1, z.shape[1])), np.nan)
+    return (i, j), np.concatenate([padding, corr], axis=1)[:, :z.shape[1]]
+
+def lagged_correlations(matrix, max_lag=MAX_LAG):
+    """
+    Kreuzkorrelation aller Paare für die Verschiebungen -max_lag..+max_lag per FFT (O(Tage log Tage) pro Paar,
+    statt einer Korrelation pro Verschiebung). Wert bei Verschiebung L = Korrelation von a[t] mit b[t + L],
+    ein positives L heißt also: a läuft b um L Tage voraus.
+    Liefert (Paar-Indizes, Verschiebungen, Array Paare x Verschiebungen).
+    """
+    z = _standardize(np.asarray(matrix, dtype="float64"))
+    length = z.shape[1]
+    max_lag = min(max_lag, max(length - 1, 0))
+    i, j = _pair_indices(z.shape[0])
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    mask = (~np.isnan(z)).astype("float64")
+    z0 = np.nan_to_num(z)
+
+    # Auf eine Zweierpotenz auffüllen, die lang genug ist, damit sich das Signal nicht zyklisch überlappt
+    nfft = 1 << (length + max_lag - 1).bit_length()
+    spectrum = {name: np.fft.rfft(values, nfft, axis=1) for name, values in (("z", z0), ("zz", z0 ** 2), ("m", mask))}
+
+    def cross(a, b, rows_a, rows_b):
+        """Summe über t von a_i[t] * b_j[t + L] für die Paare eines Blocks und die gesuchten Verschiebungen L."""
+        full = np.fft.irfft(np.conj(spectrum[a][rows_a]) * spectrum[b][rows_b], nfft, axis=1)
+        return full[:, lags % nfft]
+
+    # Paare blockweise, damit der Speicher bei vielen Zeitreihen nicht explodiert (Paare x nfft komplexe Werte)
+    corr = np.empty((len(i), len(lags)))
+    for start in range(0, len(i), PAIR_BLOCK):
+        a, b = i[start:start + PAIR_BLOCK], j[start:start + PAIR_BLOCK]
+        n = np.rint(cross("m", "m", a, b))
+        corr[start:start + PAIR_BLOCK] = _pearson(
+            n, cross("z", "m", a, b), cross("m", "z", a, b), cross("zz", "m", a, b), cross("m", "zz", a, b), cross("z", "z", a, b)
+        )
+    return (i, j), lags, corr
+
+def correlation_report(series_by_name, max_lag=MAX_LAG, window=ROLLING_WINDOW):
+    """
+    Legt alle TimeSeries auf ein gemeinsames Tages-Raster und berechnet Korrelationsmatrix, gleitende
+    Korrelation und Vorlauf/Nachlauf für alle Paare in einem Durchgang.
+    Verglichen werden die Tagesänderungen, nicht die Werte selbst: Zwei Reihen mit Trend (Kurse, Zinsen)
+    korrelieren über ein paar Wochen fast immer stark, auch wenn sie nichts miteinander zu tun haben.
+    Eine Änderung zählt nur an Tagen mit echtem Messwert; nach einer Lücke (Wochenende bei Börsen- und
+    Zinsdaten) gilt sie seit dem letzten Messwert.
+    Gibt None zurück, wenn weniger als zwei Zeitreihen oder weniger als zwei Tage Daten haben.
+    """
+    series_by_name = {name: ts for name, ts in series_by_name.items() if ts is not None and not ts.empty}
+    if len(series_by_name) < 2:
+        return None
+
+    names, days, levels = stack_series(series_by_name)
+    if len(days) < 2:
+        return None
+    measured = ~np.isnan(levels[:, 1:])
+    matrix = np.diff(_forward_fill(levels), axis=1)
+    matrix[~measured] = np.nan
+    days = days[1:]
+    # Gemeinsame Tage mit echter Änderung (aufgefüllte Tage zählen nicht)
+    observed = (~np.isnan(matrix)).astype("float64")
+    observed = observed @ observed.T
+
+    corr = correlation_matrix(matrix)
+    (i, j), rolling = rolling_correlations(matrix, window)
+    _, lags, lagged = lagged_correlations(matrix, max_lag)
+    labels = [f"{names[a]} ~ {names[b]}" for a, b in zip(i, j)]
+
+    # Stärkster Zusammenhang über alle Verschiebungen (Paare ganz ohne Werte bleiben NaN)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        best = np.argmax(np.nan_to_num(np.abs(lagged), nan=-1), axis=1)
+        rolling_min = np.nanmin(rolling, axis=1)
+        rolling_max = np.nanmax(rolling, axis=1)
+    lag_corr = lagged[np.arange(len(labels)), best]
+
+    rolling_frame = pd.DataFrame(rolling.T, index=days, columns=labels)
+    rolling_last = rolling_frame.ffill().iloc[-1].to_numpy()
+
+    pairs = pd.DataFrame({
+        "a": [names[a] for a in i],
+        "b": [names[b] for b in j],
+        "corr": corr[i, j],
+        "best_lag": lags[best],
+        "lag_corr": lag_corr,
+        "rolling_last": rolling_last,
+        "rolling_min": rolling_min,
+        "rolling_max": rolling_max,
+        "observed": observed[i, j].astype(int),
+    }, index=labels)
+    # Interessant ist ein starker Zusammenhang (gleichzeitig oder versetzt) – oder ein Bruch,
+    # wenn sich die Korrelation zuletzt deutlich vom Gesamtbild entfernt hat
+    pairs["score"] = (
+        np.fmax(pairs["corr"].abs(), pairs["lag_corr"].abs())
+        + (pairs["rolling_last"] - pairs["corr"]).abs().fillna(0) / 2
+    )
+
+    return CorrelationReport(
+        matrix=pd.DataFrame(corr, index=names, columns=names),
+        pairs=pairs.sort_values("score", ascending=False),
+        rolling=rolling_frame,
+        lags=pd.DataFrame(lagged, index=labels, columns=lags),
+    )
+
+def most_interesting_pair(report, candidates=None, min_corr=MIN_PAIR_CORR, min_observed=MIN_OBSERVED_DAYS, min_lag_corr=MIN_LAG_CORR):
+    """
+    Das Paar mit dem höchsten score (optional nur unter candidates = Namen, die vorkommen dürfen).
+    Nur Paare mit einem echten Zusammenhang kommen in Frage: |r| gleichzeitig ab min_corr oder versetzt ab
+    min_lag_corr, und mindestens min_observed Tage, an denen beide Reihen gemessen wurden. Sonst wäre bei
+    vielen Paaren und Verschiebungen über wenige Tage fast immer ein Zufallstreffer dabei.
+    Liefert die Zeile aus report.pairs oder None.
+    """
+    if report is None:
+        return None
+    pairs = report.pairs.dropna(subset=["score"])
+    strong = (pairs["corr"].abs() >= min_corr) | (pairs["lag_corr"].abs() >= min_lag_corr)
+    pairs = pairs[strong & (pairs["observed"] >= min_observed)]
+    if candidates is not None:
+        pairs = pairs[pairs["a"].isin(candidates) & pairs["b"].isin(candidates)]
+    if pairs.empty:
+        return None
+    return pairs.iloc[0]
@@ -0,0 +1,143 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Kennzahlen, die für jede Zeitreihe berechnet werden (Spalten des Ergebnisses von trend_stats)
+STAT_COLUMNS = [
+    "last", "change_7d", "wow_change", "wow_pct", "zscore",
+    "high", "low", "pct_from_high", "pct_from_low",
+    "slope_7d", "slope_7d_pct", "streak_days", "streak_direction",
+]
+
+# Unter so vielen Datenpunkten ist ein Wochenvergleich nicht aussagekräftig
+MIN_POINTS_WOW = 14
+
+def stack_series(series_by_name):
+    """
+    Legt mehrere TimeSeries auf ein gemeinsames Tages-Raster (lückenloser Kalender, fehlende Tage = NaN).
+    Liefert (Namen, Tages-Index, 2-D-Array mit einer Zeile pro Zeitreihe).
+    """
+    names = list(series_by_name)
+    frame = pd.concat([series_by_name[name].series for name in names], axis=1, keys=range(len(names)))
+    days = pd.date_range(frame.index.min(), frame.index.max(), freq="D", name="timestamp")
+    matrix = frame.reindex(days).to_numpy(dtype="float64").T
+    return names, days, matrix
+
+def _forward_fill(matrix):
+    """Füllt Lücken jeder Zeile mit dem letzten bekannten Wert (vektorisiert, ohne Schleife über Zeilen)."""
+    positions = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    return matrix[np.arange(matrix.shape[0])[:, None], positions]
+
+def _align_right(matrix):
+    """
+    Verschiebt jede Zeile so, dass ihr letzter Datenpunkt in der letzten Spalte steht.
+    So bezieht sich "letzte 7 Tage" immer auf die eigenen Daten (FRED hinkt z.B. ein paar Tage hinterher).
+    """
+    columns = np.arange(matrix.shape[1])
+    last_valid = np.where(~np.isnan(matrix), columns, -1).max(axis=1)
+    source = columns - (matrix.shape[1] - 1 - last_valid[:, None])
+    aligned = matrix[np.arange(matrix.shape[0])[:, None], np.clip(source, 0, None)]
+    aligned[source < 0] = np.nan
+    return aligned
+
+def _slope(window):
+    """Steigung der Regressionsgeraden pro Zeile (Einheit pro Tag), Lücken werden ignoriert."""
+    x = np.broadcast_to(np.arange(window.shape[1], dtype="float64"), window.shape)
+    valid = ~np.isnan(window)
+    count = valid.sum(axis=1)
+
+    x_mean = np.where(valid, x, 0).sum(axis=1) / np.maximum(count, 1)
+    y_mean = np.nansum(window, axis=1) / np.maximum(count, 1)
+    dx = np.where(valid, x - x_mean[:, None], 0)
+    dy = np.where(valid, window - y_mean[:, None], 0)
+
+    denominator = (dx ** 2).sum(axis=1)
+    return np.where((count >= 2) & (denominator > 0), (dx * dy).sum(axis=1) / np.where(denominator > 0, denominator, 1), np.nan)
+
+def _streak(matrix):
+    """
+    Wie viele beobachtete Tage in Folge (bis zum letzten Datenpunkt) sich der Wert in dieselbe Richtung bewegt hat.
+    Liefert (Länge, Richtung +1/-1/0); Tage ohne Datenpunkt unterbrechen die Serie nicht.
+    """
+    if matrix.shape[1] < 2:
+        # Ein einzelner Tag hat noch keine Bewegung
+        none = np.zeros(matrix.shape[0], dtype=int)
+        return none, none
+
+    filled = _forward_fill(matrix)
+    signs = np.sign(np.diff(filled, axis=1))
+    # Nur Tage mit echtem Datenpunkt (und einem Vorgänger) zählen
+    signs[np.isnan(matrix[:, 1:]) | np.isnan(filled[:, :-1])] = np.nan
+
+    reversed_signs = signs[:, ::-1]
+    valid = ~np.isnan(reversed_signs)
+    has_any = valid.any(axis=1)
+    direction = reversed_signs[np.arange(len(signs)), np.argmax(valid, axis=1)]
+
+    breaks = valid & (reversed_signs != direction[:, None])
+    first_break = np.where(breaks.any(axis=1), np.argmax(breaks, axis=1), signs.shape[1])
+    before_break = np.arange(signs.shape[1]) < first_break[:, None]
+    length = (valid & before_break).sum(axis=1)
+
+    return np.where(has_any, length, 0), np.where(has_any, direction, 0)
+
+def compute_trend_stats(matrix):
+    """
+    Berechnet alle Kennzahlen für viele Zeitreihen gleichzeitig.
+    matrix: 2-D-Array (Zeile = Zeitreihe, Spalte = Kalendertag, fehlende Tage = NaN).
+    Liefert {Kennzahl: 1-D-Array mit einem Wert pro Zeitreihe}, siehe STAT_COLUMNS.
+    """
+    matrix = _align_right(np.asarray(matrix, dtype="float64"))
+    rows = np.arange(matrix.shape[0])
+    filled = _forward_fill(matrix)
+    count = (~np.isnan(matrix)).sum(axis=1)
+
+    # Zeitreihen ganz ohne Werte in einem Fenster ergeben NaN, das ist gewollt -> Warnungen unterdrücken
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        last = filled[:, -1]
+        # Vergleich mit dem Stand vor 7 Kalendertagen
+        week_ago = filled[:, -8] if matrix.shape[1] >= 8 else np.full(len(rows), np.nan)
+        change_7d = last - week_ago
+
+        # Wochenvergleich: Durchschnitt der letzten 7 Tage gegen die 7 Tage davor
+        recent = np.nanmean(matrix[:, -7:], axis=1)
+        previous = np.nanmean(matrix[:, -14:-7], axis=1) if matrix.shape[1] >= 14 else np.full(len(rows), np.nan)
+        enough = count >= MIN_POINTS_WOW
+        wow_change = np.where(enough, recent - previous, np.nan)
+        wow_pct = np.where(enough & (previous > 0), wow_change / previous * 100, np.where(enough, 0.0, np.nan))
+
+        # Wie ungewöhnlich ist der letzte Wert im Vergleich zum ganzen Zeitraum?
+        mean = np.nanmean(matrix, axis=1)
+        std = np.nanstd(matrix, axis=1)
+        zscore = np.where(std > 0, (last - mean) / std, 0.0)
+
+        high = np.nanmax(matrix, axis=1)
+        low = np.nanmin(matrix, axis=1)
+        pct_from_high = np.where(high != 0, (last - high) / np.abs(high) * 100, np.nan)
+        pct_from_low = np.where(low != 0, (last - low) / np.abs(low) * 100, np.nan)
+
+        slope_7d = _slope(matrix[:, -7:])
+        slope_7d_pct = np.where(recent != 0, slope_7d / np.abs(recent) * 100, np.nan)
+
+    streak_days, streak_direction = _streak(matrix)
+
+    return {
+        "last": last, "change_7d": change_7d, "wow_change": wow_change, "wow_pct": wow_pct, "zscore": zscore,
+        "high": high, "low": low, "pct_from_high": pct_from_high, "pct_from_low": pct_from_low,
+        "slope_7d": slope_7d, "slope_7d_pct": slope_7d_pct,
+        "streak_days": streak_days, "streak_direction": streak_direction,
+    }
+
+def trend_stats(series_by_name):
+    """
+    Kennzahlen für mehrere TimeSeries in einem Durchgang ({Name: TimeSeries} -> DataFrame, eine Zeile pro Name).
+    Leere oder fehlende Zeitreihen werden übersprungen.
+    """
+    series_by_name = {name: ts for name, ts in series_by_name.items() if ts is not None and not ts.empty}
+    if not series_by_name:
+        return pd.DataFrame(columns=STAT_COLUMNS)
+
+    names, _, matrix = stack_series(series_by_name)
+    return pd.DataFrame(compute_trend_stats(matrix), index=names, columns=STAT_COLUMNS)
@@ -1,53 +1,50 @@
-import requests
-import pandas as pd
-from datetime import datetime, timedelta
+from .http_client import http_get
+from .timeseries import TimeSeries
+from .timeseries_store import load_incremental
 
 def get_exchange_rate_data(base="EUR", target="USD", days=30):
     """
     Holt die historischen Wechselkurse der Europäischen Zentralbank (EZB).
     Nutzt die quelloffene Frankfurter API (kein API-Key notwendig).
+    Bereits bekannte Tage kommen aus dem lokalen Zeitreihen-Speicher.
     """
     print(f"💶 Lade Wechselkurse ({base} zu {target}) der letzten {days} Tage...")
-    
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    start_str = start_date.strftime('%Y-%m-%d')
-    end_str = end_date.strftime('%Y-%m-%d')
-    
-    # Frankfurter API Endpoint für Zeitreihen
-    url = f"https://api.frankfurter.app/{start_str}..{end_str}?from={base}&to={target}"
-    
-    try:
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            rates = data.get("rates", {})
-            
-            if not rates:
-                print("❌ Keine Wechselkursdaten erhalten.")
+
+    def fetch_rows(start_date, end_date):
+        start_str = start_date.strftime('%Y-%m-%d')
+        end_str = end_date.strftime('%Y-%m-%d')
+
+        # Frankfurter API Endpoint für Zeitreihen
+        url = f"https://api.frankfurter.app/{start_str}..{end_str}?from={base}&to={target}"
+
+        try:
+            response = http_get(url, timeout=10)
+
+            if response.status_code == 200:
+                data = response.json()
+                rates = data.get("rates", {})
+
+                # Die API gibt ein Dictionary zurück (Datum -> {Währung: Kurs}).
+                # Ein leerer Zeitraum (z.B. nur Wochenende) ist kein Fehler
+                return TimeSeries.from_arrays(
+                    list(rates.keys()), [rate_info.get(target) for rate_info in rates.values()],
+                    date_format='%Y-%m-%d'
+                )
+
+            else:
+                print(f"⚠️ EZB API Fehler: HTTP {response.status_code}")
                 return None
-                
-            all_data = []
-            # Die API gibt ein Dictionary zurück (Datum -> {Währung: Kurs})
-            for date_str, rate_info in rates.items():
-                val = rate_info.get(target)
-                if val:
-                    all_data.append({'timestamp': pd.to_datetime(date_str).date(), 'Aufrufe': val})
-                    
-            df = pd.DataFrame(all_data)
-            
-            # Sortieren, um sicherzugehen, dass die Zeitachse im Plotter stimmt
-            df = df.sort_values('timestamp').reset_index(drop=True)
-            
-            print(f"✅ Wechselkurs-Daten erfolgreich geladen! (Aktuell: {df['Aufrufe'].iloc[-1]:.4f} {target})")
-            return df
-            
-        else:
-            print(f"⚠️ EZB API Fehler: HTTP {response.status_code}")
+
+        except Exception as e:
+            print(f"❌ Fehler bei der Wechselkurs API-Abfrage: {e}")
             return None
-            
-    except Exception as e:
-        print(f"❌ Fehler bei der Wechselkurs API-Abfrage: {e}")
+
+    # Der Referenzkurs des aktuellen Tages erscheint erst am Nachmittag -> 2 Tage offen lassen
+    ts = load_incremental("frankfurter", f"{base}/{target}", days, fetch_rows, refresh_days=2,
+                          unit="$" if target == "USD" else target, label=f"{base}/{target}")
+    if ts is None:
+        print("❌ Keine Wechselkursdaten erhalten.")
         return None
+
+    print(f"✅ Wechselkurs-Daten erfolgreich geladen! (Aktuell: {ts.last:.4f} {target})")
+    return ts
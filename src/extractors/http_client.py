@@ -0,0 +1,103 @@
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .rate_limiter import limiter
+
+# Ein gemeinsamer, sauberer Header für alle Anfragen.
+# Wikipedia blockiert Skripte ohne diesen Header extrem schnell!
+HEADERS = {
+    "User-Agent": "WikiTrendBot/1.1 (https://github.com/AlexFractalNode/social-infographic-bot; bot@example.com)",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Standard-Timeout (Sekunden), falls ein Aufruf keinen eigenen mitgibt
+DEFAULT_TIMEOUT = 10
+
+# So viele offene Verbindungen halten wir pro Host bereit (passt zu den parallelen Abrufen)
+POOL_SIZE = 16
+
+# Wie oft wir nach HTTP 429 erneut anfragen und wie lange wir dafür höchstens warten
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_WAIT = 60
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Liefert die gemeinsame HTTP-Session für alle Extractors und Publisher.
+    Verbindungen werden pro Host wiederverwendet (Keep-Alive), dadurch entfällt
+    der TCP+TLS-Handshake bei jeder weiteren Anfrage an denselben Server.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+
+            # Nur reine Verbindungsfehler automatisch wiederholen (die Anfrage kam nie beim Server an)
+            retries = Retry(total=2, connect=2, read=0, status=0, other=0, backoff_factor=0.5)
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+            _session = session
+        return _session
+
+def _retry_after_seconds(response, attempt):
+    """Liest Retry-After (Sekunden oder HTTP-Datum). Ohne Header: exponentiell wachsende Pause."""
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    return 2.0 * (2 ** attempt)
+
+def _request(method, url, **kwargs):
+    """
+    Schickt eine Anfrage über die gemeinsame Session.
+    Vorher wird beim Rate Limiter des Hosts ein Token geholt; bei HTTP 429 wird der Host
+    für die angegebene Zeit gesperrt und die Anfrage wiederholt.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    host = urlparse(url).hostname or ""
+
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        limiter.acquire(host)
+        response = get_session().request(method, url, **kwargs)
+
+        if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+            return response
+
+        wait = _retry_after_seconds(response, attempt)
+        if wait > MAX_RETRY_WAIT:
+            # Bei stundenlangen Sperren (z.B. Tageskontingent) hat Warten keinen Sinn
+            print(f"⚠️ Rate Limit bei {host} erreicht (Sperre {wait:.0f}s). Gebe auf.")
+            return response
+
+        print(f"⏳ Rate Limit bei {host} erreicht. Warte {wait:.1f}s und versuche es erneut...")
+        limiter.block_for(host, wait)
+
+        # Datei-Uploads müssen für den neuen Versuch wieder von vorne gelesen werden
+        for file_obj in (kwargs.get("files") or {}).values():
+            if hasattr(file_obj, "seek"):
+                file_obj.seek(0)
+
+    return response
+
+def http_get(url, **kwargs):
+    """GET über die gemeinsame Session (mit Standard-Timeout und Rate Limiting)."""
+    return _request("GET", url, **kwargs)
+
+def http_post(url, **kwargs):
+    """POST über die gemeinsame Session (mit Standard-Timeout und Rate Limiting)."""
+    return _request("POST", url, **kwargs)
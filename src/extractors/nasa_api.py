@@ -1,76 +1,115 @@
 import os
-import time
-import requests
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
+
+from .http_client import http_get
+from .parallel import fetch_all
+from .timeseries import TimeSeries
+from .timeseries_store import get_store, load_incremental
+
+# Die NASA Feed-API erlaubt max. 7 Tage (inklusive Start- und Enddatum) pro Anfrage
+WINDOW_DAYS = 7
+
+# Wie viele Zeitfenster gleichzeitig laufen (das eigentliche Tempo regelt der Rate Limiter)
+MAX_PARALLEL_WINDOWS = 4
+
+# Wie oft ein fehlgeschlagenes Zeitfenster einzeln neu versucht wird
+MAX_ATTEMPTS = 3
+
+def plan_windows(start_date, end_date):
+    """Teilt den Zeitraum lückenlos und ohne Überlappung in 7-Tage-Fenster auf."""
+    windows = []
+    current_start = start_date
+    while current_start <= end_date:
+        current_end = min(current_start + timedelta(days=WINDOW_DAYS - 1), end_date)
+        windows.append((current_start, current_end))
+        current_start = current_end + timedelta(days=1)
+    return windows
+
+def _fetch_window(start_date, end_date, api_key):
+    """Lädt ein Zeitfenster und liefert die Anzahl pro Tag als TimeSeries – oder None, wenn es fehlschlägt."""
+    start_str = start_date.strftime('%Y-%m-%d')
+    end_str = end_date.strftime('%Y-%m-%d')
+
+    url = f"https://api.nasa.gov/neo/rest/v1/feed?start_date={start_str}&end_date={end_str}&api_key={api_key}"
+
+    try:
+        print(f"   -> Lade Zeitraum: {start_str} bis {end_str}...")
+        response = http_get(url, timeout=10)
+
+        if response.status_code == 200:
+            data = response.json()
+            near_earth_objects = data.get('near_earth_objects', {})
+
+            # Wir zählen, wie viele Asteroiden an diesem Tag vorbeiflogen
+            return TimeSeries.from_arrays(
+                list(near_earth_objects.keys()), [len(asteroids) for asteroids in near_earth_objects.values()],
+                date_format='%Y-%m-%d'
+            )
+
+        elif response.status_code == 429:
+            print(f"⚠️ NASA API Rate Limit erreicht ({start_str} bis {end_str}).")
+        else:
+            print(f"⚠️ NASA API Fehler: HTTP {response.status_code}")
+
+    except Exception as e:
+        print(f"❌ Fehler bei der NASA API-Abfrage: {e}")
+
+    return None
 
 def get_nasa_neo_data(days=30):
     """
     Holt die Anzahl der erdnahen Asteroiden (NEOs) pro Tag von der NASA API.
-    Da die NASA API max. 7 Tage pro Anfrage erlaubt, stückeln wir die Abfrage.
+    Da die NASA API max. 7 Tage pro Anfrage erlaubt, planen wir die Zeitfenster vorab
+    und laden sie parallel. Bereits bekannte Tage kommen aus dem lokalen Zeitreihen-Speicher.
     """
     print(f"☄️ Lade NASA Asteroiden-Daten für die letzten {days} Tage...")
-    
+
     # Key aus den Secrets laden (oder DEMO_KEY als Notfall-Fallback)
     api_key = os.getenv("NASA_API_KEY", "DEMO_KEY")
-    
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    current_end = end_date
-    all_data = []
-    
-    # In 7-Tage-Schritten rückwärts durch die Zeit gehen
-    while current_end > start_date:
-        # Der Startpunkt des aktuellen Häppchens
-        current_start = max(current_end - timedelta(days=7), start_date)
-        
-        start_str = current_start.strftime('%Y-%m-%d')
-        end_str = current_end.strftime('%Y-%m-%d')
-        
-        url = f"https://api.nasa.gov/neo/rest/v1/feed?start_date={start_str}&end_date={end_str}&api_key={api_key}"
-        
-        try:
-            print(f"   -> Lade Zeitraum: {start_str} bis {end_str}...")
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                near_earth_objects = data.get('near_earth_objects', {})
-                
-                # Daten auspacken und zählen
-                for date_key, asteroids in near_earth_objects.items():
-                    # Wir zählen, wie viele Asteroiden an diesem Tag vorbeiflogen
-                    count = len(asteroids)
-                    all_data.append({'timestamp': pd.to_datetime(date_key).date(), 'Wert': count})
-            
-            elif response.status_code == 429:
-                print("⚠️ NASA API Rate Limit erreicht. Breche Schleife ab.")
+
+    def fetch_rows(start_date, end_date):
+        pending = plan_windows(start_date, end_date)
+        parts = []
+
+        # Fehlgeschlagene Fenster werden in der nächsten Runde einzeln erneut angefragt
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if attempt > 1:
+                print(f"🔁 Versuch {attempt}/{MAX_ATTEMPTS} für {len(pending)} fehlgeschlagene Zeitfenster...")
+
+            results = fetch_all(
+                {window: (lambda w=window: _fetch_window(w[0], w[1], api_key)) for window in pending},
+                max_workers=MAX_PARALLEL_WINDOWS
+            )
+
+            failed = []
+            for (window_start, window_end), window_ts in results.items():
+                if window_ts is None:
+                    failed.append((window_start, window_end))
+                    continue
+                # Nur Tage aus dem angefragten Fenster übernehmen, damit sich nichts doppelt
+                parts.append(window_ts.between(window_start, window_end).series)
+
+            pending = failed
+            if not pending:
                 break
-            else:
-                print(f"⚠️ NASA API Fehler: HTTP {response.status_code}")
-                
-        except Exception as e:
-            print(f"❌ Fehler bei der NASA API-Abfrage: {e}")
-            
-        # Den Zeitraum für den nächsten Schleifendurchlauf verschieben
-        current_end = current_start - timedelta(days=1)
-        
-        # Kurze Pause, um die NASA-Server nicht zu spammen
-        time.sleep(1.5) 
-        
-    if not all_data:
+
+        ts = TimeSeries(pd.concat(parts).sort_index()) if parts else TimeSeries.from_arrays([], [])
+
+        # Kontrolle: Jeder Tag des Zeitraums muss genau einmal vorkommen
+        missing = pd.date_range(start_date, end_date, freq="D").difference(ts.index)
+
+        if len(missing):
+            print(f"⚠️ NASA-Daten unvollständig: {len(missing)} Tage fehlen (z.B. {missing[0].date()}).")
+            # Teilergebnis trotzdem sichern, den Zeitraum aber nicht als vollständig markieren
+            get_store().save("nasa", "neo_count", ts)
+            return None
+        return ts
+
+    ts = load_incremental("nasa", "neo_count", days, fetch_rows, label="Erdnahe Asteroiden")
+    if ts is None:
         print("❌ Keine NASA-Daten gefunden.")
         return None
-        
-    df = pd.DataFrame(all_data)
-    
-    # Nach Datum sortieren (da wir rückwärts in der Zeit gereist sind)
-    df = df.sort_values('timestamp').reset_index(drop=True)
-    
-    # WICHTIGER TRICK: Wir benennen die Spalte vorerst in 'Aufrufe' um, 
-    # damit unsere plotter.py Datei das Diagramm ohne Absturz zeichnen kann!
-    df = df.rename(columns={'Wert': 'Aufrufe'})
-    
-    print(f"✅ NASA-Daten erfolgreich geladen! ({len(df)} Tage verarbeitet)")
-    return df
+
+    print(f"✅ NASA-Daten erfolgreich geladen! ({len(ts)} Tage verarbeitet)")
+    return ts
@@ -1,81 +1,298 @@
 import os
-import requests
+import json
+from contextlib import closing
+
+from .http_client import http_get, http_post
+from .parallel import fetch_all
+from .ttl_cache import TTLCache, cache_key
+
+# Per Umgebungsvariable umstellbar, z.B. auf den lokalen Stub-Server (scripts/groq_stub_server.py)
+GROQ_API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1").rstrip("/")
+GNEWS_API_BASE = os.getenv("GNEWS_API_BASE", "https://gnews.io/api/v4").rstrip("/")
+GROQ_URL = f"{GROQ_API_BASE}/chat/completions"
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+# Antwort-Budget pro Thema im Sammel-Prompt (entspricht dem Einzel-Aufruf)
+TOKENS_PER_TOPIC = 150
+
+# Schlagzeilen ändern sich über den Tag, die KI-Antwort zu identischen Schlagzeilen dagegen nicht.
+# Das GNews-Gratiskontingent (100 Anfragen/Tag) ist unser Engpass -> lieber länger cachen.
+GNEWS_CACHE_TTL = int(os.getenv("GNEWS_CACHE_TTL_MINUTES", "180")) * 60
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL_MINUTES", "1440")) * 60
+
+_gnews_cache = TTLCache("gnews", GNEWS_CACHE_TTL)
+_llm_cache = TTLCache("groq", LLM_CACHE_TTL)
+
+def _fetch_headlines(query, language, gnews_key):
+    """Holt bis zu 3 Schlagzeilen von GNews (gecacht nach Suchbegriff + Sprache). Bei Fehlern None."""
+    def fetch():
+        gnews_url = f"{GNEWS_API_BASE}/search?q={query}&lang={language}&max=3&apikey={gnews_key}"
+        response = http_get(gnews_url, timeout=10)
+        if response.status_code != 200:
+            print(f"⚠️ GNews API Fehler: {response.text}")
+            return None
+        return [
+            {"title": a.get("title"), "description": a.get("description")}
+            for a in response.json().get('articles', [])
+        ]
+
+    return _gnews_cache.get_or_fetch(cache_key(query.lower(), language, 3), fetch)
+
+def _groq_headers(groq_key):
+    return {
+        "Authorization": f"Bearer {groq_key}",
+        "Content-Type": "application/json"
+    }
+
+def _stream_groq(payload, groq_key):
+    """
+    Fragt Groq im Streaming-Modus (Server-Sent Events) an und liefert die Text-Stücke, sobald sie ankommen.
+    Der Timeout gilt dabei pro Stück, nicht für die ganze Antwort.
+    """
+    response = http_post(GROQ_URL, headers=_groq_headers(groq_key), json={**payload, "stream": True},
+                         timeout=15, stream=True)
+    with closing(response):
+        if response.status_code != 200:
+            print(f"⚠️ Groq API Fehler: {response.text}")
+            return
+
+        # SSE ist immer UTF-8, Groq schickt aber keinen charset mit
+        response.encoding = "utf-8"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            choices = json.loads(data).get("choices") or [{}]
+            token = (choices[0].get("delta") or {}).get("content")
+            if token:
+                yield token
+
+def _ask_groq(payload, groq_key, validate=None, stream=False):
+    """
+    Schickt den Payload an Groq (gecacht über Prompt + Modell-Parameter) und liefert den Antworttext oder None.
+    Optional prüft validate(text) die Antwort; unbrauchbare Antworten werden nicht gecacht.
+    Mit stream=True wird die Antwort per Streaming abgeholt und hier zusammengesetzt.
+    """
+    def fetch():
+        if stream:
+            text = "".join(_stream_groq(payload, groq_key)).strip()
+            return text or None
+
+        response = http_post(GROQ_URL, headers=_groq_headers(groq_key), json=payload, timeout=15)
+        if response.status_code != 200:
+            print(f"⚠️ Groq API Fehler: {response.text}")
+            return None
+        text = response.json()['choices'][0]['message']['content'].strip()
+        if validate and not validate(text):
+            print("⚠️ Groq-Antwort hat nicht das erwartete Format.")
+            return None
+        return text
+
+    return _llm_cache.get_or_fetch(cache_key(payload), fetch)
+
+def _api_keys():
+    """Liefert (GNews-Key, Groq-Key) oder None, wenn einer fehlt."""
+    gnews_key = os.getenv("GNEWS_API_KEY")
+    groq_key = os.getenv("GROQ_API_KEY")
+    
+    if not gnews_key or not groq_key:
+        print("⚠️ Warnung: GNews oder Groq API Keys fehlen. Überspringe News-Analyse.")
+        return None
+    return gnews_key, groq_key
+
+def _format_headlines(articles):
+    news_context = ""
+    for i, article in enumerate(articles):
+        news_context += f"{i+1}. {article['title']} - {article['description']}\n"
+    return news_context
+
+def _strip_quotes(ai_text):
+    if ai_text.startswith('"') and ai_text.endswith('"'):
+        ai_text = ai_text[1:-1]
+    return ai_text
+
+TEST_MODE_TEXT = "🛠️ [TEST-MODUS] Dies ist ein Platzhalter. Hier würde normalerweise die KI erklären, warum das Thema trendet."
+
+def _prepare_analysis(thema, language):
+    """Holt die Schlagzeilen und baut den Groq-Payload. Liefert (payload, groq_key) oder None."""
+    keys = _api_keys()
+    if not keys:
+        return None
+    gnews_key, groq_key = keys
+        
+    query = thema.replace('_', ' ')
+    
+    articles = _fetch_headlines(query, language, gnews_key)
+    if articles is None:
+        return None
+    if not articles:
+        print("ℹ️ Keine aktuellen Nachrichten zu diesem Thema gefunden.")
+        return None
+        
+    news_context = _format_headlines(articles)
+        
+    print("🧠 Lasse Groq KI (Llama 3.1) die Nachrichten analysieren...")
+    
+    prompt = (
+        f"Du bist ein Social Media Redakteur. Das Thema '{query}' trendet gerade extrem auf Wikipedia. "
+        f"Hier sind die aktuellsten Schlagzeilen dazu:\n\n{news_context}\n\n"
+        f"Fasse basierend auf diesen Schlagzeilen in maximal 2 kurzen, knackigen Sätzen zusammen, WARUM das Thema gerade trendet. "
+        f"Schreibe es so, dass es direkt in einen Social Media Post passt (gerne mit 1 Emoji). "
+        f"Antworte NUR mit den zwei Sätzen, ohne Einleitung, ohne Grußformel."
+    )
+    
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7,
+        "max_tokens": 150
+    }
+    return payload, groq_key
 
 # NEU: Wir fügen den Parameter test_mode=False hinzu
-def get_news_and_analyze(thema, language="de", test_mode=False):
+def get_news_and_analyze(thema, language="de", test_mode=False, stream=False):
     """
     Sucht aktuelle Nachrichten zum Thema und lässt die Groq KI den Grund erklären.
-    Im test_mode werden keine echten APIs aufgerufen.
+    Im test_mode werden keine echten APIs aufgerufen. Mit stream=True wird die Antwort
+    per Streaming geholt (Timeout pro Textstück statt für die ganze Antwort).
     """
     print(f"📰 Suche nach dem 'Warum' für das Thema: {thema}...")
     
     # 🛑 TEST-MODUS ABFANGEN
     if test_mode:
         print("🛠️ TEST-MODUS AKTIV: Überspringe GNews und Groq APIs, um Tokens zu sparen!")
-        return "🛠️ [TEST-MODUS] Dies ist ein Platzhalter. Hier würde normalerweise die KI erklären, warum das Thema trendet."
+        return TEST_MODE_TEXT
     
     # --- Ab hier läuft der normale, echte API-Code ---
-    gnews_key = os.getenv("GNEWS_API_KEY")
-    groq_key = os.getenv("GROQ_API_KEY")
-    
-    if not gnews_key or not groq_key:
-        print("⚠️ Warnung: GNews oder Groq API Keys fehlen. Überspringe News-Analyse.")
-        return ""
-        
-    query = thema.replace('_', ' ')
-    gnews_url = f"https://gnews.io/api/v4/search?q={query}&lang={language}&max=3&apikey={gnews_key}"
-    
     try:
-        news_response = requests.get(gnews_url, timeout=10)
-        news_data = news_response.json()
+        prepared = _prepare_analysis(thema, language)
+        if not prepared:
+            return ""
         
-        articles = news_data.get('articles', [])
-        if not articles:
-            print("ℹ️ Keine aktuellen Nachrichten zu diesem Thema gefunden.")
+        ai_text = _ask_groq(*prepared, stream=stream)
+        if not ai_text:
             return ""
             
-        news_context = ""
-        for i, article in enumerate(articles):
-            news_context += f"{i+1}. {article['title']} - {article['description']}\n"
-            
-        print("🧠 Lasse Groq KI (Llama 3.1) die Nachrichten analysieren...")
-        
-        groq_url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {groq_key}",
-            "Content-Type": "application/json"
-        }
-        
-        prompt = (
-            f"Du bist ein Social Media Redakteur. Das Thema '{query}' trendet gerade extrem auf Wikipedia. "
-            f"Hier sind die aktuellsten Schlagzeilen dazu:\n\n{news_context}\n\n"
-            f"Fasse basierend auf diesen Schlagzeilen in maximal 2 kurzen, knackigen Sätzen zusammen, WARUM das Thema gerade trendet. "
-            f"Schreibe es so, dass es direkt in einen Social Media Post passt (gerne mit 1 Emoji). "
-            f"Antworte NUR mit den zwei Sätzen, ohne Einleitung, ohne Grußformel."
-        )
-        
-        payload = {
-            "model": "llama-3.1-8b-instant", # Dein aktualisiertes Modell!
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7,
-            "max_tokens": 150
-        }
-        
-        groq_response = requests.post(groq_url, headers=headers, json=payload, timeout=15)
-        
-        if groq_response.status_code == 200:
-            groq_data = groq_response.json()
-            ai_text = groq_data['choices'][0]['message']['content'].strip()
+        ai_text = _strip_quotes(ai_text)
+        print(f"✅ KI-Analyse erfolgreich abgeschlossen.")
+        return ai_text
             
-            if ai_text.startswith('"') and ai_text.endswith('"'):
-                ai_text = ai_text[1:-1]
-                
+    except Exception as e:
+        print(f"⚠️ Fehler bei der News-Analyse: {e}")
+        return ""
+
+def stream_news_analysis(thema, language="de", test_mode=False):
+    """
+    Wie get_news_and_analyze, liefert den KI-Text aber Stück für Stück, während Groq ihn noch schreibt
+    (für das Dashboard). Die fertige Antwort landet im selben Cache wie beim normalen Aufruf.
+    """
+    print(f"📰 Suche nach dem 'Warum' für das Thema: {thema}...")
+    if test_mode:
+        yield TEST_MODE_TEXT
+        return
+
+    try:
+        prepared = _prepare_analysis(thema, language)
+        if not prepared:
+            return
+        payload, groq_key = prepared
+
+        # Schon einmal beantwortet -> sofort komplett ausliefern
+        key = cache_key(payload)
+        cached = _llm_cache.get(key)
+        if cached is not None:
+            yield _strip_quotes(cached)
+            return
+
+        parts = []
+        for token in _stream_groq(payload, groq_key):
+            parts.append(token)
+            yield token
+
+        ai_text = "".join(parts).strip()
+        if ai_text:
+            _llm_cache.put(key, ai_text)
             print(f"✅ KI-Analyse erfolgreich abgeschlossen.")
-            return ai_text
-        else:
-            print(f"⚠️ Groq API Fehler: {groq_response.text}")
-            return ""
             
     except Exception as e:
         print(f"⚠️ Fehler bei der News-Analyse: {e}")
-        return ""
+
+def _parse_batch_answer(text, count):
+    """Liest die JSON-Antwort {"1": "...", "2": "..."} in eine Liste (ein Eintrag pro Thema) ein."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    answers = [data.get(str(i + 1)) for i in range(count)]
+    if not all(isinstance(a, str) and a.strip() for a in answers):
+        return None
+    return [_strip_quotes(a.strip()) for a in answers]
+
+def analyze_topics(themen, language="de", test_mode=False):
+    """
+    Wie get_news_and_analyze, aber für viele Themen auf einmal: Die Schlagzeilen werden parallel geholt
+    und alle Themen in EINER Groq-Anfrage (JSON-Antwort) analysiert. Liefert {Thema: Text}.
+    Ist die Antwort unbrauchbar, wird für jedes Thema einzeln nachgefragt.
+    """
+    themen = list(dict.fromkeys(t for t in themen if t))
+    if not themen:
+        return {}
+    if test_mode or len(themen) == 1:
+        return {t: get_news_and_analyze(t, language, test_mode=test_mode) for t in themen}
+
+    keys = _api_keys()
+    if not keys:
+        return {t: "" for t in themen}
+    gnews_key, groq_key = keys
+
+    print(f"📰 Suche Schlagzeilen für {len(themen)} Themen gleichzeitig...")
+    headlines = fetch_all({t: (lambda t=t: _fetch_headlines(t.replace('_', ' '), language, gnews_key)) for t in themen})
+
+    results = {t: "" for t in themen}
+    topics = [t for t in themen if headlines.get(t)]
+    if not topics:
+        print("ℹ️ Keine aktuellen Nachrichten zu diesen Themen gefunden.")
+        return results
+
+    blocks = ""
+    for i, thema in enumerate(topics):
+        blocks += f"Thema {i+1}: '{thema.replace('_', ' ')}'\n{_format_headlines(headlines[thema])}\n"
+
+    prompt = (
+        f"Du bist ein Social Media Redakteur. Die folgenden {len(topics)} Themen trenden gerade. "
+        f"Zu jedem Thema findest du die aktuellsten Schlagzeilen:\n\n{blocks}\n"
+        f"Fasse für JEDES Thema basierend auf seinen Schlagzeilen in maximal 2 kurzen, knackigen Sätzen zusammen, WARUM es gerade trendet. "
+        f"Schreibe es so, dass es direkt in einen Social Media Post passt (gerne mit 1 Emoji). "
+        f"Antworte NUR mit einem JSON-Objekt, Schlüssel ist die Themen-Nummer als String: "
+        f'{{"1": "...", "2": "..."}}'
+    )
+
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.7,
+        "max_tokens": TOKENS_PER_TOPIC * len(topics),
+        "response_format": {"type": "json_object"},
+    }
+
+    print(f"🧠 Lasse Groq KI {len(topics)} Themen in einer Anfrage analysieren...")
+    answers = None
+    try:
+        text = _ask_groq(payload, groq_key, validate=lambda t: _parse_batch_answer(t, len(topics)) is not None)
+        answers = _parse_batch_answer(text, len(topics)) if text else None
+    except Exception as e:
+        print(f"⚠️ Fehler bei der Sammel-Analyse: {e}")
+
+    if answers is None:
+        # Fallback: einzeln nachfragen (Schlagzeilen kommen dabei aus dem Cache)
+        print("🔁 Sammel-Analyse fehlgeschlagen, frage die Themen einzeln ab...")
+        results.update(fetch_all({t: (lambda t=t: get_news_and_analyze(t, language)) for t in topics}))
+        return {t: text or "" for t, text in results.items()}
+
+    print(f"✅ KI-Analyse für {len(topics)} Themen erfolgreich abgeschlossen.")
+    results.update(zip(topics, answers))
+    return results
@@ -0,0 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+
+def fetch_all(jobs, max_workers=None):
+    """
+    Führt unabhängige Abrufe (API-Calls, KI-Analyse) gleichzeitig aus.
+    Erwartet ein Dictionary {Name: Funktion ohne Argumente} und liefert {Name: Ergebnis}.
+    Schlägt ein Abruf fehl, steht für diesen Namen None im Ergebnis.
+    """
+    if not jobs:
+        return {}
+
+    # Die Abrufe warten fast nur auf das Netzwerk, daher reichen Threads völlig aus
+    with ThreadPoolExecutor(max_workers=max_workers or len(jobs)) as pool:
+        futures = {name: pool.submit(job) for name, job in jobs.items()}
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"❌ Fehler beim parallelen Abruf '{name}': {e}")
+                results[name] = None
+        return results
@@ -0,0 +1,97 @@
+import time
+import threading
+
+# Erlaubte Anfragen pro Host: (Anfragen pro Sekunde, Burst-Größe).
+# Die Werte orientieren sich an den offiziellen (kostenlosen) Kontingenten der jeweiligen APIs.
+RATE_LIMITS = {
+    "api.coingecko.com": (10 / 60, 3),        # Public API: ca. 10 Aufrufe pro Minute
+    "api.nasa.gov": (1000 / 3600, 10),        # Persönlicher Key: 1.000 Aufrufe pro Stunde
+    "wikimedia.org": (25, 25),                # Pageview-API: max. 100/s, wir bleiben deutlich darunter
+    "wikipedia.org": (10, 10),                # gilt für alle Sprachversionen (de.wikipedia.org, ...)
+    "gnews.io": (1, 1),                       # Free-Tier: 1 Anfrage pro Sekunde
+    "api.groq.com": (30 / 60, 5),             # Free-Tier: 30 Anfragen pro Minute
+    "api.stlouisfed.org": (120 / 60, 10),     # FRED: 120 Anfragen pro Minute
+    "api.frankfurter.app": (5, 5),
+    "api.open-meteo.com": (600 / 60, 10),     # 600 Anfragen pro Minute
+    "api.telegram.org": (30, 30),             # Bot API: ca. 30 Nachrichten pro Sekunde
+}
+
+# Für alle anderen Hosts
+DEFAULT_LIMIT = (5, 5)
+
+class TokenBucket:
+    """
+    Klassischer Token-Bucket: Jede Anfrage verbraucht ein Token, Tokens füllen sich mit der Rate wieder auf.
+    Solange Tokens da sind, geht die Anfrage sofort raus – gewartet wird nur, wenn das Budget aufgebraucht ist.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Blockiert so lange, bis ein Token frei ist, und verbraucht es."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+
+            # Außerhalb des Locks schlafen, damit andere Threads weiter nachfüllen/prüfen können
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        """Sperrt den Host für eine bestimmte Zeit (z.B. nach HTTP 429 mit Retry-After)."""
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0
+            self.updated = now
+
+
+class RateLimiter:
+    """Verwaltet einen Token-Bucket pro Host."""
+
+    def __init__(self, limits=None, default=DEFAULT_LIMIT):
+        self.limits = RATE_LIMITS if limits is None else limits
+        self.default = default
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _limit_for(self, host):
+        # Exakter Treffer oder Domain-Endung (z.B. "de.wikipedia.org" -> "wikipedia.org")
+        for pattern, limit in self.limits.items():
+            if host == pattern or host.endswith("." + pattern):
+                return limit
+        return self.default
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(*self._limit_for(host))
+            return self.buckets[host]
+
+    def acquire(self, host):
+        self.bucket(host).acquire()
+
+    def block_for(self, host, seconds):
+        self.bucket(host).block_for(seconds)
+
+
+# Gemeinsamer Limiter für den ganzen Prozess (alle Threads teilen sich das Budget)
+limiter = RateLimiter()
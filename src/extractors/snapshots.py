@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .crypto_api import get_crypto_data
+from .fred_api import get_fred_data
+from .weather_api import get_weather_data
+from .exchange_api import get_exchange_rate_data
+from .nasa_api import get_nasa_neo_data
+from .news_analyzer import analyze_topics
+from .parallel import fetch_all
+from .timeseries import TimeSeries
+
+# Fertig aufbereitete Daten für das Dashboard: eine Parquet-Datei, die nur der Refresher schreibt
+SNAPSHOT_PATH = os.getenv("DASHBOARD_SNAPSHOT_PATH", "data/snapshots/dashboard.parquet")
+
+# So viele Tage hält der Snapshot vor (= größter Zeitraum im Dashboard-Slider)
+SNAPSHOT_DAYS = 90
+
+# Wie oft der Refresher neue Daten holt
+REFRESH_MINUTES = int(os.getenv("SNAPSHOT_REFRESH_MINUTES", "30"))
+
+SNAPSHOT_SOURCES = {
+    "crypto": lambda: get_crypto_data(coin_id="bitcoin", days=SNAPSHOT_DAYS),
+    "fred": lambda: get_fred_data(series_id="DGS10", days=SNAPSHOT_DAYS),
+    "weather": lambda: get_weather_data(city="Berlin", lat=52.52, lon=13.41, days=SNAPSHOT_DAYS),
+    "exchange": lambda: get_exchange_rate_data(base="EUR", target="USD", days=SNAPSHOT_DAYS),
+    "nasa": lambda: get_nasa_neo_data(days=SNAPSHOT_DAYS),
+}
+
+# KI-Suchanfragen pro Quelle (Wetter und NASA lassen wir erstmal weg)
+AI_QUERIES = {
+    "crypto": "Kryptowährung Bitcoin Markt",
+    "fred": "US Notenbank Zinsen Wirtschaft",
+    "exchange": "Euro Dollar Wechselkurs",
+}
+
+@dataclass
+class Snapshot:
+    """Stand aller Dashboard-Daten zu einem Zeitpunkt: {Quelle: TimeSeries}, {Quelle: KI-Text}, Erstellungszeit (UTC)."""
+    series: dict
+    ai_texts: dict
+    updated_at: datetime
+
+def write_snapshot(series, ai_texts, path=SNAPSHOT_PATH):
+    """
+    Schreibt alle Zeitreihen als einen breiten DataFrame (Zeilen = Tage, Spalten = Quellen) nach Parquet.
+    Einheiten, Beschriftungen und KI-Texte stehen in den Metadaten der Datei. Leser sehen dank
+    Umbenennen immer einen vollständigen Snapshot, nie eine halb geschriebene Datei.
+    """
+    series = {key: ts for key, ts in series.items() if ts is not None and not ts.empty}
+    frame = pd.concat({key: ts.series for key, ts in series.items()}, axis=1).sort_index()
+
+    info = {
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "series": {key: {"source": ts.source, "unit": ts.unit, "label": ts.label} for key, ts in series.items()},
+        "ai_texts": ai_texts,
+    }
+    table = pa.Table.from_pandas(frame)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"snapshot": json.dumps(info, ensure_ascii=False).encode("utf-8")})
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Liest den aktuellen Snapshot oder gibt None zurück, wenn (noch) keiner existiert."""
+    try:
+        table = pq.read_table(path)
+    except (FileNotFoundError, OSError):
+        return None
+
+    info = json.loads(table.schema.metadata[b"snapshot"])
+    frame = table.to_pandas()
+    series = {
+        key: TimeSeries(frame[key].dropna().rename(meta["label"] or None), **meta)
+        for key, meta in info["series"].items()
+    }
+    return Snapshot(series, info["ai_texts"], datetime.fromisoformat(info["updated_at"]))
+
+def refresh_snapshot(path=SNAPSHOT_PATH, test_mode=False):
+    """
+    Lädt alle Quellen und die KI-Texte (gebündelt in einer Groq-Anfrage) gleichzeitig und schreibt einen neuen Snapshot.
+    Fällt eine Quelle aus, bleibt ihr letzter Stand aus dem bisherigen Snapshot erhalten. Gibt True bei Erfolg zurück.
+    """
+    print(f"🔄 Aktualisiere Dashboard-Snapshot ({len(SNAPSHOT_SOURCES)} Quellen, {len(AI_QUERIES)} KI-Analysen)...")
+    queries = list(AI_QUERIES.values())
+    jobs = {("data", key): job for key, job in SNAPSHOT_SOURCES.items()}
+    jobs[("news", None)] = lambda: analyze_topics(queries, "de", test_mode=test_mode)
+    results = fetch_all(jobs)
+
+    series = {key: results[("data", key)] for key in SNAPSHOT_SOURCES}
+    answers = results[("news", None)] or {}
+    ai_texts = {key: answers.get(query) or "" for key, query in AI_QUERIES.items()}
+
+    previous = read_snapshot(path)
+    if previous:
+        for key, ts in series.items():
+            if (ts is None or ts.empty) and key in previous.series:
+                print(f"⚠️ {key}: keine neuen Daten, behalte den letzten Stand.")
+                series[key] = previous.series[key]
+        for key, text in ai_texts.items():
+            ai_texts[key] = text or previous.ai_texts.get(key, "")
+
+    if all(ts is None or ts.empty for ts in series.values()):
+        print("❌ Keine Quelle lieferte Daten, Snapshot bleibt unverändert.")
+        return False
+
+    write_snapshot(series, ai_texts, path)
+    print(f"💾 Snapshot gespeichert: {path}")
+    return True
+
+def run_forever(interval_minutes=REFRESH_MINUTES, path=SNAPSHOT_PATH):
+    """Aktualisiert den Snapshot in festen Abständen (läuft, bis der Prozess beendet wird)."""
+    while True:
+        try:
+            refresh_snapshot(path)
+        except Exception as e:
+            print(f"❌ Fehler beim Aktualisieren des Snapshots: {e}")
+        time.sleep(interval_minutes * 60)
+
+if __name__ == "__main__":
+    # python -m src.extractors.snapshots [--interval 30] [--once]
+    parser = argparse.ArgumentParser(description="Schreibt regelmäßig die Daten für das Dashboard in den lokalen Snapshot")
+    parser.add_argument("--interval", type=int, default=REFRESH_MINUTES, help="Minuten zwischen zwei Aktualisierungen")
+    parser.add_argument("--once", action="store_true", help="Nur einmal aktualisieren und beenden")
+    args = parser.parse_args()
+
+    if args.once:
+        refresh_snapshot()
+    else:
+        run_forever(args.interval)
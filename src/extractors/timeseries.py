@@ -0,0 +1,92 @@
+from dataclasses import dataclass, replace
+import numpy as np
+import pandas as pd
+
+@dataclass
+class TimeSeries:
+    """
+    Einheitliches Format für alle Datenquellen: eine Series mit Tages-Index (datetime64) und float64-Werten,
+    dazu Metadaten für Grafik und Text (Quelle, Einheit, Beschriftung).
+    Erzeugt wird sie spaltenweise aus den API-Arrays, nicht Zeile für Zeile.
+    """
+    series: pd.Series
+    source: str = ""
+    unit: str = ""
+    label: str = ""
+
+    # ---------- Konstruktoren ----------
+    @classmethod
+    def from_arrays(cls, dates, values, date_unit=None, date_format=None, keep="last", **meta):
+        """
+        Baut eine Zeitreihe aus zwei gleich langen Arrays (Datum, Wert).
+        date_unit="ms" für Unix-Zeitstempel in Millisekunden, date_format für feste String-Formate.
+        Nicht-numerische Werte (z.B. "." bei FRED, None bei Open-Meteo) fallen raus, doppelte Tage
+        werden nach keep ("first"/"last") aufgelöst.
+        """
+        index = pd.to_datetime(np.asarray(dates), unit=date_unit, format=date_format).normalize().as_unit("ns")
+        values = pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors="coerce").to_numpy(dtype="float64")
+
+        series = pd.Series(values, index=pd.DatetimeIndex(index, name="timestamp"), name=meta.get("label") or None)
+        series = series[~np.isnan(values)]
+        series = series[~series.index.duplicated(keep=keep)].sort_index()
+        return cls(series, **meta)
+
+    @classmethod
+    def from_pairs(cls, pairs, **kwargs):
+        """Aus [[Datum, Wert], ...] – z.B. CoinGecko-Preise [[Zeitstempel_ms, Preis], ...]."""
+        dates, values = zip(*pairs) if len(pairs) else ((), ())
+        return cls.from_arrays(dates, values, **kwargs)
+
+    @classmethod
+    def from_records(cls, records, date_key, value_key, **kwargs):
+        """Aus einer Liste von Dictionaries, z.B. FRED-Observations [{"date": ..., "value": ...}, ...]."""
+        frame = pd.DataFrame.from_records(records, columns=[date_key, value_key])
+        return cls.from_arrays(frame[date_key].to_numpy(), frame[value_key].to_numpy(), **kwargs)
+
+    @classmethod
+    def from_mapping(cls, mapping, **kwargs):
+        """Aus {Datum: Wert}, z.B. {"2024-01-31": 12}."""
+        return cls.from_arrays(list(mapping.keys()), list(mapping.values()), **kwargs)
+
+    # ---------- Zugriff ----------
+    def __len__(self):
+        return len(self.series)
+
+    @property
+    def empty(self):
+        return self.series.empty
+
+    @property
+    def index(self):
+        return self.series.index
+
+    @property
+    def values(self):
+        return self.series.to_numpy()
+
+    @property
+    def last(self):
+        """Der aktuellste Wert."""
+        return float(self.series.iloc[-1])
+
+    def with_meta(self, **meta):
+        """Kopie mit geänderten Metadaten (die Daten selbst werden geteilt, nicht kopiert)."""
+        return replace(self, **meta)
+
+    def between(self, start, end):
+        """Ausschnitt von start bis end (jeweils inklusive, Datum oder Timestamp)."""
+        return replace(self, series=self.series.loc[pd.Timestamp(start):pd.Timestamp(end)])
+
+    def tail(self, days):
+        """Die letzten `days` Kalendertage bis zum neuesten Datenpunkt."""
+        if self.empty:
+            return self
+        end = self.series.index[-1]
+        return replace(self, series=self.series.loc[end - pd.Timedelta(days=days - 1):])
+
+    def align(self, other, name=None, other_name=None):
+        """Legt zwei Zeitreihen auf die gemeinsamen Tage und liefert einen DataFrame mit zwei Spalten."""
+        return pd.concat(
+            [self.series.rename(name or self.label or "Wert1"), other.series.rename(other_name or other.label or "Wert2")],
+            axis=1, join="inner"
+        )
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from itertools import repeat
+from datetime import datetime, timedelta
+import pandas as pd
+
+from .timeseries import TimeSeries
+
+# Speicherort der lokalen Datenbank (in GitHub Actions wird der Ordner per Cache mitgenommen)
+DB_PATH = os.getenv("TIMESERIES_DB", "data/timeseries.db")
+
+class TimeSeriesStore:
+    """
+    Lokaler SQLite-Speicher für alle Zeitreihen, Schlüssel: (Quelle, Serien-ID, Datum).
+    Zusätzlich merken wir uns pro Serie, welcher Zeitraum bereits vollständig geladen wurde,
+    damit Lücken ohne Datenpunkte (Wochenenden, Feiertage) nicht jedes Mal neu angefragt werden.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    source TEXT, series_id TEXT, date TEXT, value REAL,
+                    PRIMARY KEY (source, series_id, date)
+                );
+                CREATE TABLE IF NOT EXISTS coverage (
+                    source TEXT, series_id TEXT, first_date TEXT, last_date TEXT,
+                    PRIMARY KEY (source, series_id)
+                );
+            """)
+
+    def _connect(self):
+        # Eine Verbindung pro Aufruf, damit parallele Extractor-Threads sich nicht in die Quere kommen
+        conn = sqlite3.connect(self.path, timeout=30)
+        return _CommitAndClose(conn)
+
+    def missing_start(self, source, series_id, start_date, end_date):
+        """Gibt das erste Datum zurück, das noch von der API geholt werden muss (oder None)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT first_date, last_date FROM coverage WHERE source = ? AND series_id = ?",
+                (source, series_id)
+            ).fetchone()
+
+        if row is None:
+            return start_date
+
+        first_date = datetime.strptime(row[0], '%Y-%m-%d').date()
+        last_date = datetime.strptime(row[1], '%Y-%m-%d').date()
+
+        # Fehlt der Anfang, laden wir einmal den ganzen Zeitraum (einfacher als zwei Lücken)
+        if start_date < first_date:
+            return start_date
+        if end_date > last_date:
+            return last_date + timedelta(days=1)
+        return None
+
+    def save(self, source, series_id, ts):
+        """Speichert eine TimeSeries. Bereits vorhandene Tage werden überschrieben."""
+        dates = ts.index.strftime('%Y-%m-%d')
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO observations (source, series_id, date, value) VALUES (?, ?, ?, ?)",
+                zip(repeat(source), repeat(series_id), dates, ts.values.tolist())
+            )
+
+    def mark_covered(self, source, series_id, start_date, end_date):
+        """Merkt sich, dass der Zeitraum start_date bis end_date vollständig geladen ist."""
+        if end_date < start_date:
+            return
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT first_date, last_date FROM coverage WHERE source = ? AND series_id = ?",
+                (source, series_id)
+            ).fetchone()
+
+            first_str, last_str = start_date.isoformat(), end_date.isoformat()
+            if row is not None:
+                # ISO-Strings lassen sich direkt vergleichen
+                first_str, last_str = min(row[0], first_str), max(row[1], last_str)
+
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage (source, series_id, first_date, last_date) VALUES (?, ?, ?, ?)",
+                (source, series_id, first_str, last_str)
+            )
+
+    def load(self, source, series_id, start_date, end_date, unit="", label=""):
+        """Liest den gewünschten Zeitraum als TimeSeries (Quelle = source, dazu Einheit und Beschriftung)."""
+        with self._connect() as conn:
+            df = pd.read_sql_query(
+                "SELECT date, value FROM observations "
+                "WHERE source = ? AND series_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+                conn,
+                params=(source, series_id, start_date.isoformat(), end_date.isoformat())
+            )
+
+        return TimeSeries.from_arrays(df['date'].to_numpy(), df['value'].to_numpy(), date_format='%Y-%m-%d',
+                                      source=source, unit=unit, label=label)
+
+
+class _CommitAndClose:
+    """Kleiner Context-Manager: committet am Ende und schließt die Verbindung wieder."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        with closing(self.conn):
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        return False
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Liefert den gemeinsamen Zeitreihen-Speicher (wird beim ersten Zugriff angelegt)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TimeSeriesStore()
+        return _store
+
+
+def load_incremental(source, series_id, days, fetch_rows, refresh_days=1, unit="", label=""):
+    """
+    Liest eine Zeitreihe zuerst aus dem lokalen Speicher und fragt nur die fehlenden Tage bei der API an.
+
+    fetch_rows(start_date, end_date) muss eine TimeSeries liefern oder None bei einem Fehler.
+    refresh_days: Die letzten Tage gelten als "noch nicht final" (z.B. der laufende Handelstag)
+    und werden bei jedem Lauf erneut geladen.
+    unit und label landen als Metadaten in der zurückgegebenen TimeSeries.
+    """
+    store = get_store()
+
+    end_date = datetime.utcnow().date()
+    start_date = end_date - timedelta(days=days)
+
+    fetch_start = store.missing_start(source, series_id, start_date, end_date)
+
+    if fetch_start is None:
+        print(f"💾 {source}/{series_id}: Zeitraum komplett im lokalen Speicher, kein API-Aufruf nötig.")
+    else:
+        if fetch_start > start_date:
+            print(f"💾 {source}/{series_id}: Lade nur die fehlenden Tage ab {fetch_start} nach...")
+
+        fetched = fetch_rows(fetch_start, end_date)
+        if fetched is not None:
+            store.save(source, series_id, fetched)
+            store.mark_covered(source, series_id, fetch_start, end_date - timedelta(days=refresh_days))
+        else:
+            print(f"⚠️ {source}/{series_id}: API nicht erreichbar, nutze nur die lokal gespeicherten Daten.")
+
+    ts = store.load(source, series_id, start_date, end_date, unit=unit, label=label)
+    if ts.empty:
+        return None
+    return ts
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import Future
+
+# Gemeinsamer Ordner für Bot und Dashboard (liegt im gecachten data/-Ordner)
+CACHE_DIR = os.getenv("API_CACHE_DIR", "data/cache")
+
+def cache_key(*parts):
+    """Stabiler Schlüssel aus beliebigen JSON-fähigen Teilen (z.B. Suchbegriff + Sprache oder Prompt + Modell-Parameter)."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class TTLCache:
+    """
+    Zweistufiger Cache (Arbeitsspeicher + JSON-Datei auf der Festplatte) mit Ablaufzeit.
+    Fragen mehrere Threads gleichzeitig denselben Schlüssel an, läuft der Abruf nur einmal
+    und alle Aufrufer bekommen dasselbe Ergebnis.
+    """
+
+    def __init__(self, name, ttl_seconds, directory=CACHE_DIR):
+        self.name = name
+        self.ttl = ttl_seconds
+        self.directory = os.path.join(directory, name)
+        self._memory = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._sweep()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _sweep(self):
+        """
+        Löscht beim Start alle abgelaufenen Einträge (und liegengebliebene .tmp-Dateien) aus dem Ordner.
+        Der data/-Ordner wird zwischen den Workflow-Läufen aufgehoben und würde sonst endlos wachsen.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Nur alte Reste, ein gerade laufender Schreibvorgang eines anderen Prozesses bleibt unberührt
+                try:
+                    if os.path.getmtime(path) < now - 3600:
+                        self._remove(path)
+                except OSError:
+                    pass
+            elif name.endswith(".json"):
+                entry = self._read_disk(name[:-len(".json")])
+                if entry is None or entry[0] < now:
+                    self._remove(path)
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry["expires"], entry["value"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key, expires, value):
+        # Atomar über eine temporäre Datei, da Bot und Dashboard gleichzeitig schreiben können
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"expires": expires, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError) as e:
+            print(f"⚠️ Cache '{self.name}' konnte nicht gespeichert werden: {e}")
+
+    def get(self, key):
+        """Liefert den gespeicherten Wert oder None, falls nicht vorhanden bzw. abgelaufen."""
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._memory[key] = entry
+
+        if entry is None:
+            return None
+        if entry[0] < time.time():
+            # Abgelaufen -> auch von der Festplatte entfernen
+            self._memory.pop(key, None)
+            self._remove(self._path(key))
+            return None
+        return entry[1]
+
+    def put(self, key, value):
+        expires = time.time() + self.ttl
+        self._memory[key] = (expires, value)
+        self._write_disk(key, expires, value)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Gibt den gecachten Wert zurück oder ruft fetch() auf und speichert dessen Ergebnis.
+        Liefert fetch() None (Fehler), wird nichts gespeichert, damit der nächste Lauf es erneut versucht.
+        """
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        # Ein anderer Thread holt den Wert bereits -> auf dessen Ergebnis warten
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+            if value is not None:
+                self.put(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
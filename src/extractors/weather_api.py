@@ -1,51 +1,49 @@
-import requests
-import pandas as pd
-from datetime import datetime
+from .http_client import http_get
+from .timeseries import TimeSeries
+from .timeseries_store import load_incremental
 
 def get_weather_data(city="Berlin", lat=52.52, lon=13.41, days=30):
     """
     Holt die tägliche Höchsttemperatur der letzten 30 Tage.
     Nutzt Open-Meteo (welches u.a. DWD-Daten verwendet) für perfekt formatierte historische Daten.
-    Kein API-Key notwendig!
+    Kein API-Key notwendig! Bereits bekannte Tage kommen aus dem lokalen Zeitreihen-Speicher.
     """
     print(f"🌡️ Lade Wetter-Daten (Max. Temperatur) für {city} der letzten {days} Tage...")
-    
-    # Open-Meteo API für historische und aktuelle Tagesdaten
-    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=temperature_2m_max&past_days={days}&forecast_days=0&timezone=Europe%2FBerlin"
-    
-    try:
-        response = requests.get(url, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            daily_data = data.get("daily", {})
-            
-            dates = daily_data.get("time", [])
-            temps = daily_data.get("temperature_2m_max", [])
-            
-            if not dates or not temps:
-                print("❌ Keine Wetterdaten erhalten.")
+
+    def fetch_rows(start_date, end_date):
+        past_days = (end_date - start_date).days
+
+        # Open-Meteo API für historische und aktuelle Tagesdaten
+        url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&daily=temperature_2m_max&past_days={past_days}&forecast_days=0&timezone=Europe%2FBerlin"
+
+        try:
+            response = http_get(url, timeout=10)
+
+            if response.status_code == 200:
+                data = response.json()
+                daily_data = data.get("daily", {})
+
+                dates = daily_data.get("time", [])
+                temps = daily_data.get("temperature_2m_max", [])
+
+                if not dates or not temps:
+                    print("❌ Keine Wetterdaten erhalten.")
+                    return None
+
+                # Die Open-Meteo API liefert manchmal den heutigen Tag doppelt (der erste Wert zählt)
+                return TimeSeries.from_arrays(dates, temps, date_format='%Y-%m-%d', keep="first")
+
+            else:
+                print(f"⚠️ Wetter API Fehler: HTTP {response.status_code}")
                 return None
-                
-            # 1. Erst den DataFrame mit den reinen Text-Daten erstellen
-            df = pd.DataFrame({
-                'timestamp': dates,
-                'Aufrufe': temps  # Intern nennen wir es 'Aufrufe', damit der Plotter glücklich ist!
-            })
-            
-            # 2. NEU: Erst NACHDEM die Spalte existiert, wandeln wir sie in ein Datum um!
-            df['timestamp'] = pd.to_datetime(df['timestamp']).dt.date
-            
-            # Die Open-Meteo API liefert manchmal den heutigen Tag doppelt
-            df = df.drop_duplicates(subset=['timestamp'], keep='first')
-            
-            print(f"✅ Wetter-Daten erfolgreich geladen! (Aktuell: {df['Aufrufe'].iloc[-1]}°C)")
-            return df
-            
-        else:
-            print(f"⚠️ Wetter API Fehler: HTTP {response.status_code}")
+
+        except Exception as e:
+            print(f"❌ Fehler bei der Wetter API-Abfrage: {e}")
             return None
-            
-    except Exception as e:
-        print(f"❌ Fehler bei der Wetter API-Abfrage: {e}")
+
+    ts = load_incremental("open-meteo", f"{lat},{lon}", days, fetch_rows, unit="°C", label=f"Höchsttemperatur {city}")
+    if ts is None:
         return None
+
+    print(f"✅ Wetter-Daten erfolgreich geladen! (Aktuell: {ts.last}°C)")
+    return ts
@@ -1,18 +1,26 @@
-import requests
-import pandas as pd
+import threading
 from datetime import datetime, timedelta
-import time
 
-# Ein gemeinsamer, sauberer Header für alle Anfragen. 
-# Wikipedia blockiert Skripte ohne diesen Header extrem schnell!
-HEADERS = {
-    "User-Agent": "WikiTrendBot/1.1 (https://github.com/AlexFractalNode/social-infographic-bot; bot@example.com)"
-}
+from .http_client import http_get
+from .parallel import fetch_all
+from .timeseries import TimeSeries
+from .timeseries_store import load_incremental
 
-def get_top_wikipedia_trend(language="de"):
-    """Holt den am meisten aufgerufenen Wikipedia-Artikel."""
-    print(f"🔍 Suche nach dem Top-Trend ({language}.wikipedia)...")
-    
+IGNORED_TITLES = [
+    "Hauptseite", "Wikipedia:Hauptseite", "Spezial:Suche", 
+    "Spezial:Anmelden", "Wikipedia:Impressum", "Wikipedia:Datenschutz",
+    "Cleopatra", "Wikipedia:Über_Wikipedia", "-_Hauptseite"
+]
+
+def is_content_article(title):
+    """Filtert Startseite, Spezial- und Metaseiten aus den Toplisten."""
+    return title not in IGNORED_TITLES and not title.startswith(("Spezial:", "Wikipedia:", "Datei:"))
+
+def get_top_articles(language="de"):
+    """
+    Holt die Tages-Topliste (bis zu 1000 Artikel, absteigend nach Aufrufen) ohne Meta-Seiten.
+    Liefert (Datum, [{"article": ..., "views": ...}, ...]) oder None.
+    """
     # Wir probieren erst gestern (1), dann vorgestern (2), falls Wikipedia noch nicht fertig ist
     for days_back in [1, 2]:
         target_date = datetime.utcnow() - timedelta(days=days_back)
@@ -20,87 +28,141 @@ def get_top_wikipedia_trend(language="de"):
         url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/top/{language}.wikipedia/all-access/{date_str}"
         
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            response = http_get(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 articles = data['items'][0]['articles']
-                
-                ignored_titles = [
-                    "Hauptseite", "Wikipedia:Hauptseite", "Spezial:Suche", 
-                    "Spezial:Anmelden", "Wikipedia:Impressum", "Wikipedia:Datenschutz",
-                    "Cleopatra", "Wikipedia:Über_Wikipedia", "-_Hauptseite"
-                ]
-                
-                for article in articles:
-                    title = article['article']
-                    if title not in ignored_titles and not title.startswith(("Spezial:", "Wikipedia:", "Datei:")):
-                        print(f"🌟 Top-Trend gefunden für {date_str}: {title}")
-                        return title
+                return target_date.date(), [a for a in articles if is_content_article(a['article'])]
             else:
                 print(f"⚠️ Trend-Daten für {date_str} noch nicht da (HTTP {response.status_code}). Versuche vorherigen Tag...")
         except Exception as e:
             print(f"⚠️ Fehler bei der Verbindung: {e}")
-            
-        time.sleep(1) # Kurze Pause vor dem nächsten Versuch
+
+    return None
+
+def get_top_wikipedia_trend(language="de"):
+    """Holt den am meisten aufgerufenen Wikipedia-Artikel."""
+    print(f"🔍 Suche nach dem Top-Trend ({language}.wikipedia)...")
+    
+    top = get_top_articles(language)
+    if top and top[1]:
+        date, articles = top
+        title = articles[0]['article']
+        print(f"🌟 Top-Trend gefunden für {date:%Y/%m/%d}: {title}")
+        return title
 
     print("❌ Keine Trends gefunden. Nutze Fallback.")
     return "Künstliche_Intelligenz"
 
-def get_wikipedia_summary(title, language="de"):
-    """Holt die Kurzbeschreibung (den ersten Absatz) eines Wikipedia-Artikels."""
-    url = f"https://{language}.wikipedia.org/api/rest_v1/page/summary/{title}"
-    
+# TextExtracts liefert mit exintro höchstens 20 Auszüge pro Anfrage (exlimit), mehr Titel werden ignoriert
+SUMMARY_BATCH_SIZE = 20
+SUMMARY_MAX_LENGTH = 180
+
+# Prozessweiter Cache {(Sprache, Titel): Zusammenfassung}, Zugriff aus mehreren Threads
+_summary_cache = {}
+_summary_lock = threading.Lock()
+
+def _shorten(summary):
+    summary = (summary or "").strip()
+    if len(summary) > SUMMARY_MAX_LENGTH:
+        summary = summary[:SUMMARY_MAX_LENGTH - 3] + "..."
+    return summary
+
+def _fetch_summary_batch(titles, language):
+    """Holt die Einleitungen von bis zu 20 Artikeln in einer Anfrage. Liefert {angefragter Titel: Text} oder None."""
+    url = f"https://{language}.wikipedia.org/w/api.php"
+    params = {
+        "action": "query", "format": "json", "formatversion": 2,
+        "prop": "extracts", "exintro": 1, "explaintext": 1, "exlimit": "max",
+        "redirects": 1, "titles": "|".join(titles),
+    }
+
     try:
-        time.sleep(1) # Pause für den Spam-Schutz
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            summary = data.get("extract", "")
-            if len(summary) > 180:
-                summary = summary[:177] + "..."
-            return summary
+        response = http_get(url, params=params, timeout=10)
+        if response.status_code != 200:
+            print(f"⚠️ Zusammenfassungen nicht verfügbar (HTTP {response.status_code})")
+            return None
+        query = response.json().get("query", {})
     except Exception as e:
-        print(f"⚠️ Konnte Zusammenfassung für {title} nicht laden: {e}")
-        
-    return ""
+        print(f"⚠️ Konnte Zusammenfassungen nicht laden: {e}")
+        return None
 
-def get_wikipedia_data(title, language="de", days=30):
-    """Holt die täglichen Aufrufzahlen für einen bestimmten Artikel."""
-    print(f"📊 Lade Aufruf-Daten für: {title}...")
-    
-    end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    # Format für die API: YYYYMMDD00
-    start_str = start_date.strftime('%Y%m%d00')
-    end_str = end_date.strftime('%Y%m%d00')
-    
-    url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/{language}.wikipedia/all-access/all-agents/{title}/daily/{start_str}/{end_str}"
-    
-    try:
-        time.sleep(2) # Wichtigste Pause, bevor wir die große Tabelle holen
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            items = data.get('items', [])
-            if not items:
-                print("❌ API hat keine Datenpunkte zurückgegeben.")
-                return None
-                
-            df = pd.DataFrame(items)
-            # Wir behalten nur das Wichtigste für den Graphen
-            if 'timestamp' in df.columns and 'views' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y%m%d%H').dt.date
-                # NEU: Wir benennen die Spalte für deinen Plotter wieder in 'Aufrufe' um!
-                df = df.rename(columns={'views': 'Aufrufe'})
-                return df[['timestamp', 'Aufrufe']]
+    # Die API antwortet mit normalisierten Titeln ("_" -> Leerzeichen) und folgt Weiterleitungen
+    normalized = {n["from"]: n["to"] for n in query.get("normalized", [])}
+    redirects = {r["from"]: r["to"] for r in query.get("redirects", [])}
+    extracts = {p["title"]: p.get("extract", "") for p in query.get("pages", []) if not p.get("missing")}
+
+    result = {}
+    for title in titles:
+        resolved = normalized.get(title, title)
+        resolved = redirects.get(resolved, resolved)
+        result[title] = _shorten(extracts.get(resolved, ""))
+    return result
+
+def get_wikipedia_summaries(titles, language="de"):
+    """
+    Holt die Kurzbeschreibungen vieler Artikel gebündelt (20 Titel pro Anfrage, Anfragen parallel).
+    Liefert {Titel: Zusammenfassung}; unbekannte Artikel oder Fehler ergeben "".
+    """
+    titles = list(dict.fromkeys(t for t in titles if t))
+    with _summary_lock:
+        result = {t: _summary_cache[(language, t)] for t in titles if (language, t) in _summary_cache}
+    missing = [t for t in titles if t not in result]
+
+    batches = [missing[i:i + SUMMARY_BATCH_SIZE] for i in range(0, len(missing), SUMMARY_BATCH_SIZE)]
+    fetched = fetch_all({i: (lambda b=batch: _fetch_summary_batch(b, language)) for i, batch in enumerate(batches)})
+
+    for summaries in fetched.values():
+        if summaries is None:
+            continue
+        with _summary_lock:
+            _summary_cache.update({(language, t): text for t, text in summaries.items()})
+        result.update(summaries)
+
+    return {t: result.get(t, "") for t in titles}
+
+def get_wikipedia_summary(title, language="de"):
+    """Holt die Kurzbeschreibung (den ersten Absatz) eines Wikipedia-Artikels."""
+    return get_wikipedia_summaries([title], language).get(title, "")
+
+def get_wikipedia_data(title, language="de", days=30, verbose=True):
+    """
+    Holt die täglichen Aufrufzahlen für einen bestimmten Artikel.
+    Bereits bekannte Tage kommen aus dem lokalen Zeitreihen-Speicher.
+    """
+    if verbose:
+        print(f"📊 Lade Aufruf-Daten für: {title}...")
+
+    def fetch_rows(start_date, end_date):
+        # Format für die API: YYYYMMDD00
+        start_str = start_date.strftime('%Y%m%d00')
+        end_str = end_date.strftime('%Y%m%d00')
+
+        url = f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/{language}.wikipedia/all-access/all-agents/{title}/daily/{start_str}/{end_str}"
+
+        try:
+            response = http_get(url, timeout=10)
+
+            if response.status_code == 200:
+                data = response.json()
+                items = data.get('items', [])
+                return TimeSeries.from_records(items, 'timestamp', 'views', date_format='%Y%m%d%H')
+            elif response.status_code == 404:
+                # Für ganz frische Tage (oder neue Artikel) gibt es schlicht noch keine Datenpunkte
+                return TimeSeries.from_arrays([], [])
             else:
-                return df
-        else:
-            print(f"❌ API-Fehler bei den Daten: HTTP {response.status_code}")
-            print(f"Details: {response.text[:150]}") # Zeigt an, WARUM Wikipedia blockt
+                print(f"❌ API-Fehler bei den Daten: HTTP {response.status_code}")
+                print(f"Details: {response.text[:150]}") # Zeigt an, WARUM Wikipedia blockt
+                return None
+        except Exception as e:
+            print(f"❌ Verbindungsfehler beim Datenladen: {e}")
             return None
-    except Exception as e:
-        print(f"❌ Verbindungsfehler beim Datenladen: {e}")
+
+    # Die Aufrufe von gestern stehen oft erst im Laufe des Tages bereit -> 2 Tage offen lassen
+    ts = load_incremental("wikipedia", f"{language}:{title}", days, fetch_rows, refresh_days=2,
+                          label=title.replace('_', ' '))
+    if ts is None:
+        if verbose:
+            print("❌ API hat keine Datenpunkte zurückgegeben.")
         return None
+    return ts
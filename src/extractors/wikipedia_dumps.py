@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+import gzip
+from collections import defaultdict
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Stündliche Dateien von https://dumps.wikimedia.org/other/pageviews/ (pageviews-YYYYMMDD-HHMMSS.gz)
+DUMP_DIR = os.getenv("PAGEVIEW_DUMP_DIR", "data/pageview_dumps")
+
+# Spaltenspeicher: eine Parquet-Datei pro Projekt und Tag (data/pageviews/de/2024-01-31.parquet)
+STORE_DIR = os.getenv("PAGEVIEW_STORE_DIR", "data/pageviews")
+
+# Artikel mit weniger Tagesaufrufen lassen wir weg, das hält den Speicher klein (der Long Tail ist riesig)
+MIN_DAILY_VIEWS = 10
+
+DUMP_FILENAME = re.compile(r"pageviews-(\d{8})-(\d{2})\d*\.gz$")
+
+def parse_dump(path, project="de"):
+    """
+    Liest eine stündliche Dump-Datei Zeile für Zeile (entpackt im Stream, nie komplett im Speicher)
+    und liefert (Titel, Aufrufe) für Desktop ("de") und Mobil ("de.m") des Projekts.
+    Zeilenformat: "<Domain-Code> <Titel> <Aufrufe> <Bytes>".
+    """
+    prefixes = (f"{project} ".encode(), f"{project}.m ".encode())
+
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            # Schneller Vorfilter auf Bytes, bevor wir dekodieren und zerlegen
+            if not line.startswith(prefixes):
+                continue
+            parts = line.split(b" ")
+            if len(parts) < 3:
+                continue
+            try:
+                views = int(parts[2])
+            except ValueError:
+                continue
+            yield parts[1].decode("utf-8", errors="replace"), views
+
+def find_dumps(dump_dir=DUMP_DIR):
+    """Findet alle Dump-Dateien im Ordner und gruppiert sie nach Tag: {Datum: [Pfade]}."""
+    days = defaultdict(list)
+    if not os.path.isdir(dump_dir):
+        return {}
+
+    for name in sorted(os.listdir(dump_dir)):
+        match = DUMP_FILENAME.search(name)
+        if match:
+            date = datetime.strptime(match.group(1), "%Y%m%d").date()
+            days[date].append(os.path.join(dump_dir, name))
+    return dict(days)
+
+def aggregate_day(paths, project="de"):
+    """Summiert die Stunden-Dateien eines Tages zu Tagesaufrufen pro Artikel: {Titel: Aufrufe}."""
+    totals = defaultdict(int)
+    for path in paths:
+        for title, views in parse_dump(path, project):
+            totals[title] += views
+    return totals
+
+def _partition_path(project, date, store_dir=STORE_DIR):
+    return os.path.join(store_dir, project, f"{date.isoformat()}.parquet")
+
+def _stored_hours(path):
+    """Aus wie vielen Stunden-Dateien eine gespeicherte Tages-Partition entstanden ist (0 = nicht vorhanden)."""
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (FileNotFoundError, OSError):
+        return 0
+    return int(metadata.get(b"hours", b"0"))
+
+def write_day(project, date, totals, hours, store_dir=STORE_DIR, min_views=MIN_DAILY_VIEWS):
+    """Schreibt die Tageszahlen als Parquet-Datei (Titel als Dictionary-Spalte, Aufrufe als int32)."""
+    titles = [t for t, v in totals.items() if v >= min_views]
+    views = [totals[t] for t in titles]
+
+    table = pa.table({
+        "title": pa.array(titles, type=pa.string()).dictionary_encode(),
+        "views": pa.array(views, type=pa.int32()),
+    }).replace_schema_metadata({"hours": str(hours)})
+
+    path = _partition_path(project, date, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    return len(titles)
+
+def ingest_dumps(dump_dir=DUMP_DIR, project="de", store_dir=STORE_DIR):
+    """
+    Verarbeitet alle Dump-Dateien im Ordner zu Tages-Partitionen. Tage, die schon mit mindestens
+    genauso vielen Stunden gespeichert sind, werden übersprungen. Gibt die Anzahl neu geschriebener Tage zurück.
+    """
+    days = find_dumps(dump_dir)
+    if not days:
+        print(f"ℹ️ Keine Pageview-Dumps in {dump_dir} gefunden.")
+        return 0
+
+    written = 0
+    for date, paths in sorted(days.items()):
+        if _stored_hours(_partition_path(project, date, store_dir)) >= len(paths):
+            continue
+        if len(paths) < 24:
+            print(f"⚠️ {date}: nur {len(paths)}/24 Stunden-Dateien vorhanden, Tageszahlen sind unvollständig.")
+
+        print(f"📥 Verarbeite {len(paths)} Dump-Datei(en) für {date} ({project})...")
+        try:
+            totals = aggregate_day(paths, project)
+        except (OSError, EOFError) as e:
+            print(f"❌ Dump für {date} nicht lesbar: {e}")
+            continue
+
+        count = write_day(project, date, totals, len(paths), store_dir)
+        print(f"💾 {date}: {count} Artikel mit mind. {MIN_DAILY_VIEWS} Aufrufen gespeichert.")
+        written += 1
+    return written
+
+def stored_dates(project="de", store_dir=STORE_DIR):
+    """Alle Tage, für die eine Partition existiert (aufsteigend)."""
+    folder = os.path.join(store_dir, project)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        datetime.strptime(name[:-len(".parquet")], "%Y-%m-%d").date()
+        for name in os.listdir(folder) if name.endswith(".parquet")
+    )
+
+def complete_dates(project="de", store_dir=STORE_DIR):
+    """Alle Tage, deren Partition aus allen 24 Stunden-Dateien entstanden ist (aufsteigend)."""
+    return [d for d in stored_dates(project, store_dir) if _stored_hours(_partition_path(project, d, store_dir)) >= 24]
+
+def load_day(date, project="de", min_views=0, store_dir=STORE_DIR):
+    """Tageszahlen eines Tages als Series {Titel: Aufrufe}, optional nur Artikel ab min_views."""
+    path = _partition_path(project, date, store_dir)
+    if not os.path.exists(path):
+        return None
+    table = pq.read_table(path, filters=[("views", ">=", min_views)] if min_views else None)
+    df = table.to_pandas()
+    return pd.Series(df["views"].to_numpy(), index=df["title"].astype(str), name=date)
+
+def load_daily_views(dates, project="de", titles=None, store_dir=STORE_DIR):
+    """
+    Lädt die Tageszahlen als breiten DataFrame (Zeilen = Tage, Spalten = Artikel).
+    Mit titles werden nur diese Artikel gelesen (Filter direkt beim Parquet-Lesen).
+    """
+    frames = []
+    for date in dates:
+        path = _partition_path(project, date, store_dir)
+        if not os.path.exists(path):
+            continue
+        filters = [("title", "in", list(titles))] if titles is not None else None
+        df = pq.read_table(path, filters=filters).to_pandas()
+        df["title"] = df["title"].astype(str)
+        df["timestamp"] = pd.Timestamp(date)
+        frames.append(df)
+
+    if not frames:
+        return None
+    long = pd.concat(frames, ignore_index=True)
+    return long.pivot(index="timestamp", columns="title", values="views").sort_index().astype(float)
+
+if __name__ == "__main__":
+    # python src/extractors/wikipedia_dumps.py [Dump-Ordner] [Projekt]
+    ingest_dumps(*(sys.argv[1:3]))
@@ -0,0 +1,155 @@
+import warnings
+from datetime import date as calendar_date
+import numpy as np
+import pandas as pd
+
+from .parallel import fetch_all
+from .wikipedia_api import get_top_articles, get_wikipedia_data, is_content_article
+from .wikipedia_dumps import STORE_DIR, complete_dates, load_daily_views, load_day
+
+# Wie viele Artikel der Tages-Topliste wir bewerten (die API liefert bis zu 1000)
+TOP_N = 300
+
+# Verlauf pro Artikel; die letzten BASELINE_DAYS Tage vor dem Trend-Tag bilden die "Normalität"
+HISTORY_DAYS = 30
+BASELINE_DAYS = 14
+
+# Ein echter Ausreißer braucht genug Aufrufe und mind. eine Verdopplung gegenüber dem Normalwert
+MIN_VIEWS = 5000
+MIN_RATIO = 2.0
+
+# Ohne so viele bekannte Tage im Normalwert-Zeitraum ist der Normalwert geraten (neue Artikel, Abruf-Lücken):
+# Ein neuer Artikel mit 6000 Aufrufen hätte sonst Median 0 und schlüge jeden echten Ausreißer
+MIN_BASELINE_DAYS = 7
+
+# Die Pageview-API verträgt deutlich mehr, der Token-Bucket in http_client bremst ohnehin auf 25/s
+MAX_PARALLEL_FETCHES = 16
+
+# Ältere Dump-Partitionen gelten als veraltet (sonst posten wir jeden Tag denselben alten Ausreißer);
+# die Dumps erscheinen mit rund einem Tag Verzögerung
+MAX_DUMP_AGE_DAYS = 2
+
+# Skaliert die MAD so, dass sie bei normalverteilten Daten der Standardabweichung entspricht
+MAD_TO_STD = 1.4826
+
+def score_spikes(views, baseline_days=BASELINE_DAYS, min_views=MIN_VIEWS, min_ratio=MIN_RATIO, min_baseline_days=MIN_BASELINE_DAYS):
+    """
+    Bewertet, wie stark der letzte Tag jedes Artikels vom eigenen Normalwert abweicht.
+    views: DataFrame (Zeilen = Tage aufsteigend, Spalten = Artikel), fehlende Tage als NaN.
+
+    Basis ist der Median der baseline_days Tage davor, die Streuung die MAD (beides robust gegen
+    frühere Ausreißer). Damit Dauerbrenner mit sehr glattem Verlauf keinen unendlichen z-Score bekommen,
+    gilt als Untergrenze die Poisson-Streuung sqrt(Median).
+    Liefert einen nach score absteigend sortierten DataFrame; Artikel unter den Schwellen oder mit weniger
+    als min_baseline_days bekannten Tagen im Normalwert-Zeitraum haben score NaN.
+    """
+    values = views.to_numpy(dtype=float)
+    last = values[-1]
+    baseline = values[-(baseline_days + 1):-1]
+    known_days = (~np.isnan(baseline)).sum(axis=0)
+
+    # Artikel ganz ohne Verlauf ergeben NaN (mit "All-NaN slice"-Warnung, die np.errstate nicht abfängt)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(baseline, axis=0)
+        mad = np.nanmedian(np.abs(baseline - median), axis=0)
+
+    median = np.nan_to_num(median, nan=0.0)
+    spread = np.maximum(MAD_TO_STD * np.nan_to_num(mad, nan=0.0), np.sqrt(np.maximum(median, 1.0)))
+    zscore = (last - median) / spread
+    ratio = last / np.maximum(median, 1.0)
+
+    valid = (last >= min_views) & (ratio >= min_ratio) & (known_days >= min_baseline_days)
+    scores = pd.DataFrame({
+        "views": last,
+        "baseline": median,
+        "ratio": ratio,
+        "zscore": zscore,
+        "score": np.where(valid, zscore, np.nan),
+    }, index=views.columns)
+    return scores.sort_values("score", ascending=False)
+
+def fetch_histories(titles, language="de", days=HISTORY_DAYS):
+    """
+    Lädt die Aufruf-Verläufe vieler Artikel gleichzeitig und gibt sie als breiten DataFrame
+    (Zeilen = Tage, Spalten = Artikel) zurück. Bereits bekannte Tage kommen aus dem Zeitreihen-Speicher,
+    ab dem zweiten Lauf wird pro Artikel also nur noch der neueste Tag angefragt.
+    """
+    jobs = {title: (lambda t=title: get_wikipedia_data(t, language, days=days, verbose=False)) for title in titles}
+    results = fetch_all(jobs, max_workers=MAX_PARALLEL_FETCHES)
+
+    series = {title: ts.series for title, ts in results.items() if ts is not None and not ts.empty}
+    if not series:
+        return None
+    return pd.DataFrame(series).sort_index()
+
+def find_spike_trend(language="de", top_n=TOP_N):
+    """
+    Sucht unter den top_n meistgelesenen Artikeln den mit dem stärksten Ausbruch gegenüber seinem
+    eigenen Normalwert (statt einfach Platz 1, der meist ein Dauerbrenner ist).
+    Gibt den Titel zurück oder None, wenn kein Artikel die Schwellen erreicht.
+    """
+    print(f"🔍 Suche nach dem stärksten Ausreißer unter den Top {top_n} ({language}.wikipedia)...")
+
+    top = get_top_articles(language)
+    if not top or not top[1]:
+        return None
+    date, articles = top
+    titles = [a["article"] for a in articles[:top_n]]
+
+    views = fetch_histories(titles, language)
+    if views is None:
+        return None
+
+    # Nur bis zum Tag der Topliste bewerten (für heute gibt es noch keine vollständigen Zahlen)
+    views = views.loc[:pd.Timestamp(date)]
+    if len(views) < 2 or views.index[-1] != pd.Timestamp(date):
+        print(f"⚠️ Keine Verlaufsdaten für {date} vorhanden.")
+        return None
+
+    return _best_spike(views, date)
+
+def _best_spike(views, date):
+    """Bewertet alle Artikel und gibt den Titel mit dem höchsten Score zurück (oder None)."""
+    scores = score_spikes(views).dropna(subset=["score"])
+    if scores.empty:
+        print("ℹ️ Kein Artikel mit deutlichem Ausreißer gefunden.")
+        return None
+
+    title, best = scores.index[0], scores.iloc[0]
+    print(f"🌟 Ausreißer gefunden für {date:%Y/%m/%d}: {title} "
+          f"({best['views']:.0f} Aufrufe, {best['ratio']:.1f}x Normalwert, z={best['zscore']:.1f}, "
+          f"{len(views.columns)} Artikel bewertet)")
+    return title
+
+def find_spike_trend_from_dumps(language="de", days=HISTORY_DAYS, store_dir=STORE_DIR, today=None):
+    """
+    Wie find_spike_trend, aber über ALLE Artikel aus den lokal eingelesenen Pageview-Dumps
+    (siehe wikipedia_dumps.py) statt nur der Top-1000 – ganz ohne API-Aufrufe.
+    Bewertet werden nur vollständige Tage (alle 24 Stunden-Dateien), ein angebrochener Tag sähe sonst wie ein Einbruch aus.
+    Gibt None zurück, wenn (noch) keine Dumps eingelesen wurden oder der neueste vollständige Tag älter als
+    MAX_DUMP_AGE_DAYS ist – dann übernimmt find_spike_trend mit der API.
+    """
+    dates = complete_dates(language, store_dir)
+    if len(dates) < 2:
+        return None
+
+    date = dates[-1]
+    age = ((today or calendar_date.today()) - date).days
+    if age > MAX_DUMP_AGE_DAYS:
+        print(f"ℹ️ Neueste vollständige Pageview-Dumps sind vom {date} ({age} Tage alt), nutze stattdessen die API.")
+        return None
+
+    window = [d for d in dates if (date - d).days <= days]
+    print(f"🔍 Suche nach dem stärksten Ausreißer in den Pageview-Dumps ({language}, {len(window)} Tage)...")
+
+    # Nur Artikel, die am letzten Tag überhaupt die Mindestaufrufe erreichen, kommen in die Bewertung
+    last_day = load_day(date, language, min_views=MIN_VIEWS, store_dir=store_dir)
+    candidates = [t for t in last_day.index if is_content_article(t)]
+    if not candidates:
+        print("ℹ️ Kein Artikel mit deutlichem Ausreißer gefunden.")
+        return None
+
+    # Fehlt ein Artikel an einem Tag, lag er unter der Speicher-Schwelle -> praktisch 0 Aufrufe
+    views = load_daily_views(window, language, titles=candidates, store_dir=store_dir).fillna(0)
+    return _best_spike(views, date)
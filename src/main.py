@@ -1,67 +1,169 @@
 import sys
-import time
-import pandas as pd 
+import pandas as pd
 
 # ==========================================
 # 1. IMPORTE
 # ==========================================
 # --- Unsere Plugins (Extractors) ---
-from extractors.wikipedia_api import get_wikipedia_data, get_top_wikipedia_trend, get_wikipedia_summary
-from extractors.news_analyzer import get_news_and_analyze
+from extractors.wikipedia_api import get_wikipedia_data, get_top_wikipedia_trend, get_wikipedia_summaries
+from extractors.wikipedia_trends import find_spike_trend, find_spike_trend_from_dumps
+from extractors.news_analyzer import analyze_topics, get_news_and_analyze
 from extractors.nasa_api import get_nasa_neo_data
 from extractors.crypto_api import get_crypto_data
 from extractors.weather_api import get_weather_data
 from extractors.exchange_api import get_exchange_rate_data
 from extractors.fred_api import get_fred_data
+from extractors.parallel import fetch_all
+
+# --- Analyse ---
+from analysis.trend_stats import trend_stats
+from analysis.correlation import correlation_report, most_interesting_pair, MIN_LAG_CORR, MIN_OBSERVED_DAYS, ROLLING_WINDOW
 
 # --- Engine Tools ---
-from visualizers.plotter import create_trend_chart, create_correlation_chart
-from publishers.social_poster import post_to_telegram
-from publishers.social_poster import post_to_twitter
+from visualizers.plotter import render_charts
+from publishers.dispatcher import publish_all, publish_telegram_album
 
 # ==========================================
 # 2. KONFIGURATION
 # ==========================================
-# Wähle hier das Modul für den heutigen Tag: 
+# Wähle hier die Module für den heutigen Tag (mehrere = Batch-Lauf mit gemeinsamen Abrufen):
 # "WIKIPEDIA", "NASA", "CRYPTO", "WEATHER", "EXCHANGE", "FRED" oder "CROSSOVER"
-ACTIVE_MODULE = "CROSSOVER"
+# Alternativ per Kommandozeile: python src/main.py CRYPTO FRED CROSSOVER
+ACTIVE_MODULES = ["CROSSOVER"]
 
 ENABLE_TELEGRAM = True
 ENABLE_TWITTER = False
+# Bei mehreren Grafiken pro Lauf: auf Telegram gebündelt als Album (sendMediaGroup) statt einzeln posten
+TELEGRAM_ALBUM = True
 TEST_MODE = False
 
+# Alle Datensätze, die ein Modul anfordern kann. Im Batch wird jeder Schlüssel nur EINMAL geladen,
+# auch wenn ihn mehrere Module brauchen (z.B. Bitcoin für CRYPTO und CROSSOVER).
+DATA_SOURCES = {
+    "crypto": lambda: get_crypto_data(coin_id="bitcoin", days=30),
+    "fred": lambda: get_fred_data(series_id="DGS10", days=30),
+    "weather": lambda: get_weather_data(city="Berlin", lat=52.52, lon=13.41, days=30),
+    "exchange": lambda: get_exchange_rate_data(base="EUR", target="USD", days=30),
+    "nasa": lambda: get_nasa_neo_data(days=30),
+}
+
+# Beschriftung der Datensätze, wenn sie im CROSSOVER-Modul gegeneinander antreten
+CROSSOVER_SERIES = {
+    "crypto": {"name": "Bitcoin", "label": "Bitcoin Preis ($)", "tag": "#Bitcoin", "query": "Bitcoin"},
+    "fred": {"name": "US-Zinsen", "label": "US-Zinsen (%)", "tag": "#Zinsen", "query": "US Notenbank Zinsen"},
+    "weather": {"name": "Wetter Berlin", "label": "Max. Temperatur (°C)", "tag": "#Wetter", "query": None},
+    "exchange": {"name": "EUR/USD", "label": "USD pro 1 EUR ($)", "tag": "#Euro", "query": "Euro Dollar"},
+    "nasa": {"name": "Asteroiden", "label": "Vorbeiflüge (NEOs)", "tag": "#NASA", "query": None},
+}
+
+def crossover_query(key_a, key_b):
+    """KI-Suchanfrage für ein CROSSOVER-Paar (leer, wenn keiner der beiden Datensätze eine hat)."""
+    return " ".join(q for q in (CROSSOVER_SERIES[key_a]["query"], CROSSOVER_SERIES[key_b]["query"]) if q)
+
+# Beschreibung der Module: welche Daten, welche KI-Suchanfrage und welche Texte sie brauchen.
+# WIKIPEDIA fehlt hier bewusst, da das Thema erst zur Laufzeit feststeht (siehe build_wikipedia_module).
+MODULES = {
+    "NASA": {
+        "source_name": "NASA",
+        "y_label": "Vorbeiflüge (NEOs)",
+        "thema": "Erdnahe Asteroiden",
+        "summary": "Das Center for Near Earth Object Studies (CNEOS) der NASA überwacht Kometen und Asteroiden.",
+        "data": ["nasa"],
+        "news_query": None,
+    },
+    "CRYPTO": {
+        "source_name": "Krypto",
+        "y_label": "Preis in USD ($)",
+        "thema": "Bitcoin",
+        "summary": "Bitcoin ist die weltweit erste und marktstärkste Kryptowährung.",
+        "data": ["crypto"],
+        "news_query": "Bitcoin",
+    },
+    "WEATHER": {
+        "source_name": "Umwelt/DWD",
+        "y_label": "Max. Temperatur (°C)",
+        "thema": "Klimatrend: Berlin",
+        "summary": "Die tägliche Höchsttemperatur in der Hauptstadt (DWD via Open-Meteo).",
+        "data": ["weather"],
+        "news_query": None,
+    },
+    "EXCHANGE": {
+        "source_name": "EZB",
+        "y_label": "USD pro 1 EUR ($)",
+        "thema": "Wechselkurs EUR/USD",
+        "summary": "Der offizielle Referenzkurs der Europäischen Zentralbank (EZB).",
+        "data": ["exchange"],
+        "news_query": "Euro Dollar Wechselkurs Wirtschaft",
+    },
+    "FRED": {
+        "source_name": "Makro/FRED",
+        "y_label": "Zinssatz in %",
+        "thema": "US-Staatsanleihen (10 Jahre)",
+        "summary": "Die Rendite 10-jähriger US-Staatsanleihen ist der wichtigste globale Zinsindikator.",
+        "data": ["fred"],
+        "news_query": "US Notenbank Zinsen",
+    },
+    "CROSSOVER": {
+        "source_name": "Data Crossover",
+        # Das Paar steht erst nach dem Abruf fest: das auffälligste aus allen Datensätzen (siehe prepare_crossover)
+        "data": ["crypto", "fred", "weather", "exchange", "nasa"],
+        # Ohne deutlich auffälligeres Paar bleibt es beim Klassiker; dessen KI-Analyse läuft gleich im
+        # gemeinsamen Abruf mit, nur bei einem anderen Paar wird nachträglich neu gefragt
+        "default_pair": ("crypto", "fred"),
+        "news_query": crossover_query("crypto", "fred"),
+    },
+}
+
+
 # ==========================================
 # 3. TEXT-GENERATOR
 # ==========================================
-def generate_smart_caption(df, thema, summary, ai_reason, source_name="Wikipedia"):
-    """Generiert einen dynamischen Text, passend zur Datenquelle."""
+def describe_trend(stats, unit=""):
+    """Formuliert aus den Kennzahlen (eine Zeile aus trend_stats) den Trend-Satz und ggf. eine Zusatz-Info."""
+    if stats is None or pd.isna(stats["wow_change"]):
+        return "📊 Entwicklung der letzten 30 Tage.", None
+
+    # Temperaturen: absolute Differenz statt Prozent
+    if unit == "°C":
+        diff = stats["wow_change"]
+        if diff > 2: trend_insight = f"📈 Deutlich wärmer! Im Schnitt {diff:.1f}°C wärmer als in der Vorwoche."
+        elif diff < -2: trend_insight = f"📉 Spürbar kälter! Im Schnitt {abs(diff):.1f}°C kälter als in der Vorwoche."
+        elif diff > 0: trend_insight = f"↗️ Leicht wärmer (+{diff:.1f}°C zur Vorwoche)."
+        else: trend_insight = f"↘️ Leicht kälter (-{abs(diff):.1f}°C zur Vorwoche)."
+
+    # Standard-Logik für Wikipedia, NASA, Krypto, etc. (Prozentuale Differenz)
+    else:
+        change_percent = stats["wow_pct"]
+        if change_percent > 20: trend_insight = f"📈 Starker Anstieg! Die Zahlen stiegen um {change_percent:.1f}%."
+        elif change_percent < -20: trend_insight = f"📉 Deutlicher Rückgang um {abs(change_percent):.1f}%."
+        elif change_percent > 0: trend_insight = f"↗️ Leichtes Wachstum (+{change_percent:.1f}%)."
+        else: trend_insight = f"↘️ Leichter Rückgang (-{abs(change_percent):.1f}%)."
+
+    # Die auffälligste Zusatz-Info (höchstens eine, damit der Post kurz bleibt)
+    if stats["pct_from_high"] == 0:
+        extra = "🏔️ Höchster Stand im gesamten Zeitraum!"
+    elif stats["pct_from_low"] == 0:
+        extra = "🕳️ Tiefster Stand im gesamten Zeitraum."
+    elif abs(stats["zscore"]) >= 2:
+        extra = f"⚡ Ungewöhnlicher Ausschlag: {stats['zscore']:+.1f} Standardabweichungen vom Durchschnitt."
+    elif stats["streak_days"] >= 3 and stats["streak_direction"] != 0:
+        direction = "gestiegen" if stats["streak_direction"] > 0 else "gefallen"
+        extra = f"🔁 {int(stats['streak_days'])} Messpunkte in Folge {direction}."
+    else:
+        extra = None
+
+    return trend_insight, extra
+
+def generate_smart_caption(ts, thema, summary, ai_reason, source_name="Wikipedia", stats=None):
+    """
+    Generiert einen dynamischen Text, passend zur Datenquelle (ts = TimeSeries).
+    stats: fertige Kennzahlen aus trend_stats (im Batch für alle Reihen auf einmal berechnet).
+    """
     thema_clean = thema.replace('_', ' ')
     
-    try:
-        views_col = 'Aufrufe' if 'Aufrufe' in df.columns else df.columns[-1]
-        if len(df) >= 14:
-            recent_7_days = df[views_col].tail(7).mean()
-            previous_7_days = df[views_col].iloc[-14:-7].mean()
-            
-            # Spezielle Logik für Temperaturen (Absolute Differenz statt Prozent)
-            if source_name == "Umwelt/DWD":
-                diff = recent_7_days - previous_7_days
-                if diff > 2: trend_insight = f"📈 Deutlich wärmer! Im Schnitt {diff:.1f}°C wärmer als in der Vorwoche."
-                elif diff < -2: trend_insight = f"📉 Spürbar kälter! Im Schnitt {abs(diff):.1f}°C kälter als in der Vorwoche."
-                elif diff > 0: trend_insight = f"↗️ Leicht wärmer (+{diff:.1f}°C zur Vorwoche)."
-                else: trend_insight = f"↘️ Leicht kälter (-{abs(diff):.1f}°C zur Vorwoche)."
-                    
-            # Standard-Logik für Wikipedia, NASA, Krypto, etc. (Prozentuale Differenz)
-            else:
-                change_percent = ((recent_7_days - previous_7_days) / previous_7_days) * 100 if previous_7_days > 0 else 0
-                if change_percent > 20: trend_insight = f"📈 Starker Anstieg! Die Zahlen stiegen um {change_percent:.1f}%."
-                elif change_percent < -20: trend_insight = f"📉 Deutlicher Rückgang um {abs(change_percent):.1f}%."
-                elif change_percent > 0: trend_insight = f"↗️ Leichtes Wachstum (+{change_percent:.1f}%)."
-                else: trend_insight = f"↘️ Leichter Rückgang (-{abs(change_percent):.1f}%)."
-        else:
-            trend_insight = "📊 Entwicklung der letzten 30 Tage."
-    except Exception:
-        trend_insight = "📊 Entwicklung der letzten 30 Tage."
+    if stats is None:
+        stats = trend_stats({thema: ts}).iloc[0]
+    trend_insight, extra_insight = describe_trend(stats, ts.unit)
 
     # Text flexibel zusammenbauen (mit passenden Emojis)
     if source_name == "NASA": caption = f"🪐 Der tägliche {source_name}-Datenpunkt!\n\n"
@@ -73,7 +175,9 @@ def generate_smart_caption(df, thema, summary, ai_reason, source_name="Wikipedia
     if summary: caption += f"ℹ️ Info: \"{summary}\"\n\n"
     if ai_reason: caption += f"💡 Analyse:\n{ai_reason}\n\n"
         
-    caption += f"{trend_insight}\n\n"
+    caption += f"{trend_insight}\n"
+    if extra_insight: caption += f"{extra_insight}\n"
+    caption += "\n"
     caption += f"Was denkst du über diese Entwicklung?\n\n"
     
     # Smarte Hashtag-Generierung (Trennt bei Leerzeichen & Slashes, entfernt Klammern)
@@ -97,126 +201,234 @@ def generate_smart_caption(df, thema, summary, ai_reason, source_name="Wikipedia
 # ==========================================
 # 4. HAUPTSTEUERUNG (ENGINE)
 # ==========================================
-def main():
-    print(f"🚀 Starte Data Engine... (Aktives Modul: {ACTIVE_MODULE})")
-    if TEST_MODE: print("⚠️ TEST-MODUS AKTIV.")
-    
-    # Variablen für die Engine
-    thema, summary, ai_reason, df, source_name, y_label = "", "", "", None, "", ""
-    
-    # --- DATEN-ROUTING ---
-    if ACTIVE_MODULE == "WIKIPEDIA":
-        source_name = "Wikipedia"
-        y_label = "Aufrufe"
-        thema = get_top_wikipedia_trend("de")
-        summary = get_wikipedia_summary(thema, "de")
-        ai_reason = get_news_and_analyze(thema, "de", test_mode=TEST_MODE)
-        time.sleep(2)
-        df = get_wikipedia_data(thema, days=30)
-        
-    elif ACTIVE_MODULE == "NASA":
-        source_name = "NASA"
-        y_label = "Vorbeiflüge (NEOs)"
-        thema = "Erdnahe Asteroiden"
-        summary = "Das Center for Near Earth Object Studies (CNEOS) der NASA überwacht Kometen und Asteroiden."
-        ai_reason = "" 
-        df = get_nasa_neo_data(days=30)
-
-    elif ACTIVE_MODULE == "CRYPTO":
-        source_name = "Krypto"
-        y_label = "Preis in USD ($)"
-        thema = "Bitcoin"
-        summary = "Bitcoin ist die weltweit erste und marktstärkste Kryptowährung."
-        ai_reason = get_news_and_analyze("Bitcoin", "de", test_mode=TEST_MODE)
-        df = get_crypto_data(coin_id="bitcoin", days=30)
-
-    elif ACTIVE_MODULE == "WEATHER":
-        source_name = "Umwelt/DWD"
-        y_label = "Max. Temperatur (°C)"
-        thema = "Klimatrend: Berlin"
-        summary = "Die tägliche Höchsttemperatur in der Hauptstadt (DWD via Open-Meteo)."
-        ai_reason = "" 
-        df = get_weather_data(city="Berlin", lat=52.52, lon=13.41, days=30)
-
-    elif ACTIVE_MODULE == "EXCHANGE":
-        source_name = "EZB"
-        y_label = "USD pro 1 EUR ($)"
-        thema = "Wechselkurs EUR/USD"
-        summary = "Der offizielle Referenzkurs der Europäischen Zentralbank (EZB)."
-        ai_reason = get_news_and_analyze("Euro Dollar Wechselkurs Wirtschaft", "de", test_mode=TEST_MODE)
-        df = get_exchange_rate_data(base="EUR", target="USD", days=30)
-
-    elif ACTIVE_MODULE == "FRED":
-        source_name = "Makro/FRED"
-        y_label = "Zinssatz in %"
-        thema = "US-Staatsanleihen (10 Jahre)"
-        summary = "Die Rendite 10-jähriger US-Staatsanleihen ist der wichtigste globale Zinsindikator."
-        ai_reason = get_news_and_analyze("US Notenbank Zinsen", "de", test_mode=TEST_MODE)
-        df = get_fred_data(series_id="DGS10", days=30)
-
-    elif ACTIVE_MODULE == "CROSSOVER":
-        source_name = "Krypto vs Wirtschaft"
-        thema = "Bitcoin vs US-Zinsen"
-        summary = "Wie reagiert der Krypto-Markt auf die Geldpolitik der US-Notenbank?"
-        
-        print("\n🔄 Lade Datensatz 1 (Bitcoin)...")
-        df_crypto = get_crypto_data(coin_id="bitcoin", days=30)
-        
-        print("\n🔄 Lade Datensatz 2 (FRED Zinsen)...")
-        df_fred = get_fred_data(series_id="DGS10", days=30)
-        
-        if df_crypto is not None and df_fred is not None:
-            df_crypto = df_crypto.rename(columns={'Aufrufe': 'Wert1'})
-            df_fred = df_fred.rename(columns={'Aufrufe': 'Wert2'})
-            
-            # PANDAS MAGIC: Führt beide Tabellen zusammen
-            df = pd.merge(df_crypto, df_fred, on='timestamp', how='inner')
-            ai_reason = get_news_and_analyze("Zinsen Krypto Bitcoin Einfluss", "de", test_mode=TEST_MODE)
-            
-            # Crossover-Plotter aufrufen
-            chart_path = create_correlation_chart(
-                df=df, 
-                title="Korrelation: Bitcoin vs. 10Y US-Zinsen", 
-                label_1="Bitcoin Preis ($)", 
-                label_2="US-Zinsen (%)"
-            )
-            
-            caption = f"📊 Data Crossover: Bitcoin vs. US-Notenbank\n\n"
-            caption += f"ℹ️ Info: {summary}\n\n"
-            if ai_reason: caption += f"💡 Analyse:\n{ai_reason}\n\n"
-            caption += "Was fällt dir an dieser Entwicklung auf?\n\n#Bitcoin #FRED #Zinsen #DataScience"
-            
-            if chart_path:
-                if ENABLE_TELEGRAM: post_to_telegram(chart_path, caption)
-                if ENABLE_TWITTER: post_to_twitter(chart_path, caption)
-            
-            print(f"\n🎉 Crossover-Pipeline erfolgreich durchlaufen!")
-            return 
-        else:
-            print("❌ Fehler beim Laden der Crossover-Daten.")
-            return
-        
+def build_wikipedia_module():
+    """Das Wikipedia-Modul hängt vom Tagestrend ab und wird daher erst zur Laufzeit beschrieben."""
+    # Bevorzugt den echten Ausreißer (erst aus den lokalen Dumps, sonst über die API);
+    # findet sich keiner, nehmen wir wie früher Platz 1 der Topliste
+    thema = find_spike_trend_from_dumps("de") or find_spike_trend("de") or get_top_wikipedia_trend("de")
+    return {
+        "source_name": "Wikipedia",
+        "y_label": "Aufrufe",
+        "thema": thema,
+        "summary": None,
+        "summary_title": thema,
+        "data": [f"wikipedia:{thema}"],
+        "news_query": thema,
+    }
+
+def data_job(key):
+    """Liefert die Abruf-Funktion für einen Datensatz-Schlüssel."""
+    if key.startswith("wikipedia:"):
+        title = key.split(":", 1)[1]
+        return lambda: get_wikipedia_data(title, days=30)
+    return DATA_SOURCES[key]
+
+def plan_jobs(modules):
+    """
+    Sammelt alle Abrufe der gewählten Module ein. Da die Schlüssel identisch sind,
+    landen doppelte Anfragen (gleicher Datensatz, gleiche KI-Suche) nur einmal im Plan.
+    """
+    jobs = {}
+    queries, titles = [], []
+    for config in modules.values():
+        for key in config["data"]:
+            jobs[("data", key)] = data_job(key)
+
+        query = config.get("news_query")
+        if query and query not in queries:
+            queries.append(query)
+
+        title = config.get("summary_title")
+        if title and title not in titles:
+            titles.append(title)
+
+    # Alle KI-Analysen gebündelt in einer einzigen Groq-Anfrage statt einer pro Modul
+    if queries:
+        jobs[("news", None)] = lambda: analyze_topics(queries, "de", test_mode=TEST_MODE)
+    # Ebenso alle Wikipedia-Zusammenfassungen (20 Titel pro Anfrage)
+    if titles:
+        jobs[("summary", None)] = lambda: get_wikipedia_summaries(titles, "de")
+    return jobs
+
+def publish(chart_path, caption, platforms):
+    """Schickt eine fertige Grafik gleichzeitig an die angegebenen Plattformen (jeweils in passender Größe)."""
+    return publish_all(chart_path, caption, platforms)
+
+def describe_correlation(pair, name_a, name_b):
+    """Beschreibt Stärke, Vorlauf und Veränderung der Korrelation (der Tagesänderungen) eines Paares in ein paar Zeilen."""
+    corr = pair["corr"]
+    if corr > 0.7: strength = "stark positiv 🟢"
+    elif corr < -0.7: strength = "stark negativ 🔴"
+    elif corr > 0.3: strength = "leicht positiv ↗️"
+    elif corr < -0.3: strength = "leicht negativ ↘️"
+    else: strength = "kaum vorhanden ⚪"
+    lines = [f"🔗 Korrelation der Tagesänderungen: r = {corr:.2f} ({strength})"]
+
+    # Ein Vorlauf lohnt nur, wenn er selbst stark ist und den Zusammenhang spürbar verstärkt
+    lag = int(pair["best_lag"])
+    if lag != 0 and abs(pair["lag_corr"]) >= MIN_LAG_CORR and abs(pair["lag_corr"]) - abs(corr) >= 0.1:
+        leader, follower = (name_a, name_b) if lag > 0 else (name_b, name_a)
+        lines.append(f"⏱️ {leader} läuft {follower} um {abs(lag)} Tag(e) voraus (r = {pair['lag_corr']:.2f}).")
+
+    if not pd.isna(pair["rolling_last"]) and pair["observed"] >= MIN_OBSERVED_DAYS and abs(pair["rolling_last"] - corr) >= 0.3:
+        lines.append(f"🔀 Zuletzt hat sich der Zusammenhang verschoben: r = {pair['rolling_last']:.2f} in den letzten {ROLLING_WINDOW} Tagen.")
+    return "\n".join(lines)
+
+def prepare_crossover(config, results):
+    """
+    Bereitet das CROSSOVER-Modul vor: sucht unter allen geladenen Datensätzen das auffälligste Paar
+    (stärkste gleichzeitige oder versetzte Korrelation bzw. deutlichster Bruch) und baut Grafik-Spezifikation und Text.
+    Ist kein Paar belastbar auffällig (siehe most_interesting_pair), bleibt es bei config["default_pair"].
+    """
+    series = {key: results.get(("data", key)) for key in config["data"]}
+    report = correlation_report(series)
+    pair = most_interesting_pair(report)
+    if pair is None: print("ℹ️ Kein belastbar auffälliges Paar gefunden, bleibe beim Standard-Paar.")
+
+    if pair is None and report is not None:
+        # Kennzahlen des Standard-Paares für den Text (in der Reihenfolge, in der es im Bericht steht)
+        default = set(config["default_pair"])
+        rows = report.pairs[report.pairs["a"].isin(default) & report.pairs["b"].isin(default)]
+        pair = rows.iloc[0] if len(rows) else None
+
+    key_a, key_b = (pair["a"], pair["b"]) if pair is not None else config["default_pair"]
+    ts_a, ts_b = series.get(key_a), series.get(key_b)
+
+    if ts_a is None or ts_b is None:
+        print("❌ Fehler beim Laden der Crossover-Daten.")
+        return None
+
+    info_a, info_b = CROSSOVER_SERIES[key_a], CROSSOVER_SERIES[key_b]
+    print(f"🔗 Paar: {info_a['name']} vs. {info_b['name']}")
+
+    # Die Analyse zum Standard-Paar kam schon im gemeinsamen Abruf; nur ein anderes Paar braucht eine neue Anfrage
+    query = crossover_query(key_a, key_b)
+    if not query:
+        ai_reason = ""
+    elif ("news", query) in results:
+        ai_reason = results[("news", query)] or ""
     else:
-        print(f"❌ Unbekanntes Modul: {ACTIVE_MODULE}")
-        return
-    
-    # --- PUBLISHING FÜR STANDARD-MODULE ---
-    if df is None or df.empty:
+        # Gestreamt: das Timeout gilt pro Abschnitt statt für die ganze Antwort, lange Antworten brechen nicht mittendrin ab
+        ai_reason = get_news_and_analyze(query, "de", test_mode=TEST_MODE, stream=True)
+
+    # Spezifikation für den Crossover-Plotter (legt beide Reihen selbst auf die gemeinsamen Tage)
+    spec = {
+        "kind": "correlation",
+        "series_1": ts_a,
+        "series_2": ts_b,
+        "title": f"Korrelation: {info_a['name']} vs. {info_b['name']}",
+        "label_1": info_a["label"],
+        "label_2": info_b["label"],
+    }
+
+    caption = f"📊 Data Crossover: {info_a['name']} vs. {info_b['name']}\n\n"
+    if pair is not None: caption += f"{describe_correlation(pair, info_a['name'], info_b['name'])}\n\n"
+    if ai_reason: caption += f"💡 Analyse:\n{ai_reason}\n\n"
+    caption += f"Was fällt dir an dieser Entwicklung auf?\n\n{info_a['tag']} {info_b['tag']} #Korrelation #DataScience"
+
+    return spec, caption
+
+def prepare_standard_module(config, results, stats):
+    """Bereitet ein Modul mit einer einzelnen Zeitreihe vor: Grafik-Spezifikation und Text."""
+    ts = results[("data", config["data"][0])]
+    thema, source_name = config["thema"], config["source_name"]
+    summary = config["summary"] or results.get(("summary", config.get("summary_title"))) or ""
+    ai_reason = results.get(("news", config.get("news_query"))) or ""
+
+    if ts is None or ts.empty:
         print("❌ Abbruch: Keine Daten vom Plugin empfangen.")
-        return
+        return None
+
+    # Die TimeSeries wird von Plotter und Text nur gelesen, daher kann sie im Batch geteilt werden
+    spec = {
+        "kind": "trend",
+        "series": ts,
+        "thema": thema,
+        "source_name": source_name,
+        "y_label": config["y_label"],
+    }
 
-    chart_path = create_trend_chart(df, thema, source_name=source_name, y_label=y_label)
-    if not chart_path: return
-        
     print("\n--- Generiere Text ---")
-    caption = generate_smart_caption(df, thema, summary, ai_reason, source_name)
+    key = config["data"][0]
+    row = stats.loc[key] if key in stats.index else None
+    caption = generate_smart_caption(ts, thema, summary, ai_reason, source_name, stats=row)
     print(f"Generierter Text:\n{caption}\n")
-    
-    print("--- Publishing ---")
-    if ENABLE_TELEGRAM: post_to_telegram(chart_path, caption)
-    if ENABLE_TWITTER: post_to_twitter(chart_path, caption)
-        
-    print(f"\n🎉 Pipeline ({ACTIVE_MODULE}) erfolgreich durchlaufen!")
+
+    return spec, caption
+
+def main(active_modules=None):
+    active_modules = active_modules or ACTIVE_MODULES
+    print(f"🚀 Starte Data Engine... (Aktive Module: {', '.join(active_modules)})")
+    if TEST_MODE: print("⚠️ TEST-MODUS AKTIV.")
+
+    # --- MODULE AUFLÖSEN ---
+    modules = {}
+    for name in active_modules:
+        if name == "WIKIPEDIA":
+            modules[name] = build_wikipedia_module()
+        elif name in MODULES:
+            modules[name] = MODULES[name]
+        else:
+            print(f"❌ Unbekanntes Modul: {name}")
+
+    if not modules:
+        return
+
+    # --- GEMEINSAMER DATEN-ABRUF ---
+    # Alle Datensätze, KI-Analysen und Zusammenfassungen laufen gleichzeitig und jeweils nur einmal
+    jobs = plan_jobs(modules)
+    print(f"\n🔄 Lade {len(jobs)} eindeutige Datenquellen für {len(modules)} Modul(e) gleichzeitig...")
+    results = fetch_all(jobs)
+    # Gebündelte Ergebnisse wieder auf die Schlüssel pro Thema/Titel verteilen
+    for kind in ("news", "summary"):
+        batch = results.pop((kind, None), None) or {}
+        results.update({(kind, key): text for key, text in batch.items()})
+
+    # Kennzahlen (Wochenvergleich, z-Score, Hoch/Tief, Steigung, Serie) für alle Zeitreihen in einem Durchgang
+    stats = trend_stats({key: ts for (kind, key), ts in results.items() if kind == "data"})
+
+    # --- GRAFIK & TEXT PRO MODUL VORBEREITEN ---
+    prepared = {}
+    for name, config in modules.items():
+        print(f"\n===== Modul: {name} =====")
+        if name == "CROSSOVER":
+            result = prepare_crossover(config, results)
+        else:
+            result = prepare_standard_module(config, results, stats)
+
+        if result:
+            prepared[name] = result
+
+    if not prepared:
+        return
+
+    # --- ALLE GRAFIKEN GEMEINSAM RENDERN (parallel auf allen Kernen) ---
+    chart_paths = render_charts([spec for spec, _ in prepared.values()])
+
+    # --- PUBLISHING ---
+    print("\n--- Publishing ---")
+    ready = []
+    for (name, (_, caption)), chart_path in zip(prepared.items(), chart_paths):
+        if not chart_path:
+            print(f"❌ Keine Grafik für {name}, überspringe Publishing.")
+            continue
+        print(f"✅ Grafik für {name}: {chart_path}")
+        ready.append((name, chart_path, caption))
+
+    platforms = []
+    if ENABLE_TELEGRAM: platforms.append("telegram")
+    if ENABLE_TWITTER: platforms.append("twitter")
+
+    # Mehrere Grafiken landen auf Telegram als ein Album (eine Anfrage für bis zu 10 Bilder)
+    if "telegram" in platforms and TELEGRAM_ALBUM and len(ready) > 1:
+        publish_telegram_album([(chart_path, caption) for _, chart_path, caption in ready])
+        platforms.remove("telegram")
+
+    for name, chart_path, caption in ready:
+        if platforms:
+            publish(chart_path, caption, platforms)
+        print(f"\n🎉 Pipeline ({name}) erfolgreich durchlaufen!")
 
 if __name__ == "__main__":
-    main()
+    # Module können auch direkt beim Aufruf übergeben werden
+    main([arg.upper() for arg in sys.argv[1:]] or None)
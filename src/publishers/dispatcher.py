@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+
+from .image_encoder import encode_for_platform
+from .social_poster import PublishError, broadcast_telegram_album, broadcast_telegram_photo, send_tweet
+
+# Pro Plattform: Sende-Funktion, Gesamt-Timeout (inkl. aller Versuche) und max. Anzahl Versuche
+PLATFORMS = {
+    "telegram": {"send": broadcast_telegram_photo, "timeout": 90, "attempts": 3},
+    "twitter": {"send": send_tweet, "timeout": 180, "attempts": 3},
+}
+
+# Wartezeit vor dem 2. Versuch, danach jeweils verdoppelt (2s, 4s, 8s, ...)
+BACKOFF_SECONDS = 2
+
+@dataclass
+class PublishResult:
+    """Ergebnis pro Plattform, damit der Aufrufer genau sieht, was wo geklappt hat."""
+    platform: str
+    success: bool
+    attempts: int = 0
+    duration: float = 0.0
+    post_id: object = None  # Tweet-ID bzw. {Chat-ID: Message-ID} bei Telegram
+    error: str = None
+
+def _publish_with_retries(platform, image_path, caption, deadline):
+    """Bereitet das Bild für die Plattform auf und sendet es mit exponentiellem Backoff."""
+    settings = PLATFORMS[platform]
+    start = time.monotonic()
+    upload_path = encode_for_platform(image_path, platform)
+
+    error = None
+    for attempt in range(1, settings["attempts"] + 1):
+        try:
+            post_id = settings["send"](upload_path, caption)
+            return PublishResult(platform, True, attempt, time.monotonic() - start, post_id)
+
+        except PublishError as e:
+            error = str(e)
+            if not e.retryable:
+                break
+        except Exception as e:
+            # Unbekannter Fehler: lieber nicht wiederholen, sonst droht ein doppelter Post
+            error = str(e)
+            break
+
+        wait = BACKOFF_SECONDS * (2 ** (attempt - 1))
+        if attempt == settings["attempts"] or time.monotonic() + wait >= deadline:
+            break
+
+        print(f"🔁 {platform}: Versuch {attempt} fehlgeschlagen ({error}). Neuer Versuch in {wait}s...")
+        time.sleep(wait)
+
+    return PublishResult(platform, False, attempt, time.monotonic() - start, error=error)
+
+def publish_all(image_path, caption, platforms):
+    """
+    Veröffentlicht eine Grafik gleichzeitig auf allen angegebenen Plattformen.
+    Jede Plattform hat ihren eigenen Timeout und eigene Wiederholungen; eine hängende Plattform
+    blockiert die anderen nicht. Liefert ein PublishResult pro Plattform.
+    """
+    platforms = [p for p in platforms if p in PLATFORMS]
+    if not platforms:
+        return []
+
+    print(f"📤 Veröffentliche gleichzeitig auf: {', '.join(platforms)}...")
+    pool = ThreadPoolExecutor(max_workers=len(platforms))
+    now = time.monotonic()
+    deadlines = {p: now + PLATFORMS[p]["timeout"] for p in platforms}
+    futures = {p: pool.submit(_publish_with_retries, p, image_path, caption, deadlines[p]) for p in platforms}
+
+    results = []
+    for platform, future in futures.items():
+        try:
+            result = future.result(timeout=max(0, deadlines[platform] - time.monotonic()))
+        except TimeoutError:
+            result = PublishResult(platform, False, duration=PLATFORMS[platform]["timeout"],
+                                   error=f"Timeout nach {PLATFORMS[platform]['timeout']}s")
+
+        if result.success:
+            print(f"✅ {platform}: veröffentlicht (ID {result.post_id}, {result.attempts}. Versuch, {result.duration:.1f}s)")
+        else:
+            print(f"❌ {platform}: fehlgeschlagen nach {result.attempts} Versuch(en): {result.error}")
+        results.append(result)
+
+    # Nicht auf hängende Uploads warten – deren Ergebnis ist bereits als Timeout verbucht
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def publish_telegram_album(items):
+    """
+    Verschickt mehrere Grafiken (items = [(Bildpfad, Bildunterschrift), ...]) gebündelt als Telegram-Album
+    statt als einzelne Nachrichten. Wird bewusst nicht wiederholt, da sonst bereits gesendete Alben doppelt kämen.
+    """
+    start = time.monotonic()
+    items = [(encode_for_platform(path, "telegram"), caption) for path, caption in items]
+
+    try:
+        post_ids = broadcast_telegram_album(items)
+        result = PublishResult("telegram", True, 1, time.monotonic() - start, post_ids)
+        print(f"✅ telegram: Album veröffentlicht ({result.duration:.1f}s)")
+    except PublishError as e:
+        result = PublishResult("telegram", False, 1, time.monotonic() - start, error=str(e))
+        print(f"❌ telegram: Album fehlgeschlagen: {e}")
+    return result
@@ -0,0 +1,71 @@
+import os
+from PIL import Image
+
+# Pro Plattform: maximale Kantenlänge (Pixel) und Ziel-Dateigröße (Bytes).
+# Telegram zeigt Fotos mit max. 2560px an, Twitter lässt PNGs unter ~900 KB unverändert (sonst JPEG-Neukompression).
+PLATFORM_PROFILES = {
+    "telegram": {"max_side": 2560, "max_bytes": 1_000_000},
+    "twitter": {"max_side": 1600, "max_bytes": 900_000},
+}
+
+# Fallback-Stufen, falls das Palette-PNG das Budget sprengt
+JPEG_QUALITIES = [90, 80, 70, 60]
+MIN_SIDE = 800
+
+def _save_palette_png(img, path):
+    # Unsere Grafiken haben nur wenige Farben (Hintergrund, 2 Linien, Text) -> 256er-Palette reicht locker
+    img.quantize(colors=256, method=Image.Quantize.FASTOCTREE).save(path, format="PNG", optimize=True)
+    return os.path.getsize(path)
+
+def _save_jpeg(img, path, quality):
+    img.save(path, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return os.path.getsize(path)
+
+def encode_for_platform(image_path, platform):
+    """
+    Erstellt eine plattformgerechte Version der Grafik (Auflösung, Palette-PNG oder JPEG, Byte-Budget)
+    und gibt den Pfad dazu zurück. Bei Fehlern wird das Original zurückgegeben.
+    """
+    profile = PLATFORM_PROFILES.get(platform)
+    if profile is None:
+        return image_path
+
+    try:
+        original_size = os.path.getsize(image_path)
+        base, _ = os.path.splitext(image_path)
+
+        with Image.open(image_path) as source:
+            img = source.convert("RGB")
+
+        # 1. Auf die Auflösung bringen, die die Plattform ohnehin maximal anzeigt
+        if max(img.size) > profile["max_side"]:
+            img.thumbnail((profile["max_side"], profile["max_side"]), Image.Resampling.LANCZOS)
+
+        while True:
+            # 2. Erste Wahl: Palette-PNG (gestochen scharfe Linien & Schrift)
+            out_path = f"{base}_{platform}.png"
+            size = _save_palette_png(img, out_path)
+
+            # 3. Notfalls JPEG mit abnehmender Qualität
+            if size > profile["max_bytes"]:
+                os.remove(out_path)
+                out_path = f"{base}_{platform}.jpg"
+                for quality in JPEG_QUALITIES:
+                    size = _save_jpeg(img, out_path, quality)
+                    if size <= profile["max_bytes"]:
+                        break
+
+            # 4. Passt es immer noch nicht, verkleinern wir das Bild schrittweise
+            if size <= profile["max_bytes"] or max(img.size) <= MIN_SIDE:
+                break
+            os.remove(out_path)
+            img = img.resize((int(img.width * 0.8), int(img.height * 0.8)), Image.Resampling.LANCZOS)
+
+        saved = original_size - size
+        print(f"📦 {platform}: {original_size / 1024:.0f} KB -> {size / 1024:.0f} KB "
+              f"({img.width}x{img.height}, {saved / original_size * 100:.0f}% gespart)")
+        return out_path
+
+    except Exception as e:
+        print(f"⚠️ Bild-Optimierung für {platform} fehlgeschlagen, nutze Original: {e}")
+        return image_path
@@ -1,77 +1,283 @@
 import os
+import json
+import threading
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 import tweepy
-import requests
 
-def post_to_telegram(image_path, caption):
-    """Sendet ein Bild mit Text an einen Telegram-Chat."""
-    print("📲 Bereite Telegram-Post vor...")
-    
+# Dieselbe Session wie die Extractors, egal ob src als Paket geladen wird (Dashboard: src.publishers...)
+# oder python src/main.py den Ordner src/ selbst auf den Suchpfad legt (publishers ist dann ein Top-Level-Paket)
+try:
+    from ..extractors.http_client import http_post
+except ImportError:
+    from extractors.http_client import http_post
+
+# Timeouts (Sekunden): Bild-Uploads dauern länger als normale API-Aufrufe
+TELEGRAM_TIMEOUT = 30
+TWITTER_TIMEOUT = 60
+
+# So viele Chats bekommen die file_id gleichzeitig
+MAX_PARALLEL_CHATS = 8
+
+# Telegram-Grenzen: max. 10 Bilder pro Album, max. 1024 Zeichen Bildunterschrift
+TELEGRAM_ALBUM_LIMIT = 10
+TELEGRAM_CAPTION_LIMIT = 1024
+
+class PublishError(Exception):
+    """Fehler beim Veröffentlichen. retryable=False, wenn ein neuer Versuch nichts ändern würde (z.B. fehlende Secrets)."""
+
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def get_telegram_chat_ids():
+    """
+    Alle Ziel-Chats: TELEGRAM_CHAT_IDS (kommagetrennt, z.B. "-100123,-100456,@mein_kanal")
+    oder als Fallback die einzelne TELEGRAM_CHAT_ID.
+    """
+    raw = os.getenv("TELEGRAM_CHAT_IDS") or os.getenv("TELEGRAM_CHAT_ID") or ""
+    return [chat_id.strip() for chat_id in raw.split(",") if chat_id.strip()]
+
+def _clip_caption(caption):
+    """Kürzt zu lange Bildunterschriften, statt den ganzen Post an der Telegram-Grenze scheitern zu lassen."""
+    if len(caption) <= TELEGRAM_CAPTION_LIMIT:
+        return caption
+    return caption[:TELEGRAM_CAPTION_LIMIT - 3] + "..."
+
+def _send_photo(chat_id, caption, image_path=None, file_id=None):
+    """
+    Ein sendPhoto-Aufruf: entweder mit Bild-Upload (image_path) oder mit einer bereits
+    hochgeladenen file_id. Gibt (Message-ID, file_id) zurück, wirft PublishError.
+    """
     # Secrets aus der Umgebung abrufen (werden von GitHub Actions reingereicht)
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
-    
     if not bot_token or not chat_id:
-        print("❌ Fehler: Telegram Secrets (Token oder Chat ID) fehlen!")
-        return False
-        
+        raise PublishError("Telegram Secrets (Token oder Chat ID) fehlen!", retryable=False)
+
     url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-    
+    payload = {"chat_id": chat_id, "caption": _clip_caption(caption)}
+
     try:
-        with open(image_path, 'rb') as image_file:
-            payload = {"chat_id": chat_id, "caption": caption}
-            files = {"photo": image_file}
-            
-            response = requests.post(url, data=payload, files=files)
-            
-            if response.status_code == 200:
-                print("✅ Erfolgreich an Telegram gesendet!")
-                return True
-            else:
-                print(f"❌ Telegram API Fehler: {response.text}")
-                return False
-    except Exception as e:
-        print(f"❌ Fehler beim Senden an Telegram: {e}")
-        return False
+        if file_id:
+            # Telegram kennt das Bild schon -> nur die ID schicken, kein erneuter Upload
+            response = http_post(url, data={**payload, "photo": file_id}, timeout=TELEGRAM_TIMEOUT)
+        else:
+            with open(image_path, 'rb') as image_file:
+                response = http_post(url, data=payload, files={"photo": image_file}, timeout=TELEGRAM_TIMEOUT)
+    except OSError as e:
+        # Netzwerkfehler und Timeouts (requests-Fehler sind ebenfalls OSErrors)
+        raise PublishError(f"Verbindung zu Telegram fehlgeschlagen: {e}")
 
+    if response.status_code == 200:
+        result = response.json()["result"]
+        # Telegram liefert mehrere Größen, die letzte ist das Original
+        return result["message_id"], result["photo"][-1]["file_id"]
+
+    # 429 und Serverfehler sind vorübergehend, andere 4xx (falsche Chat-ID, zu langer Text, ...) nicht
+    retryable = response.status_code == 429 or response.status_code >= 500
+    raise PublishError(f"Telegram API Fehler ({chat_id}): {response.text}", retryable=retryable)
+
+def send_telegram_photo(image_path, caption, chat_id=None):
+    """Sendet ein Bild mit Text an EINEN Telegram-Chat und gibt die Message-ID zurück (wirft PublishError)."""
+    chat_ids = get_telegram_chat_ids()
+    message_id, _ = _send_photo(chat_id or (chat_ids[0] if chat_ids else None), caption, image_path=image_path)
+    return message_id
+
+def broadcast_telegram_photo(image_path, caption, chat_ids=None):
+    """
+    Sendet dasselbe Bild an viele Chats: Der erste Chat bekommt den echten Upload,
+    alle weiteren nur noch die file_id, die Telegram dabei zurückgibt – parallel gesendet.
+    Liefert {Chat-ID: Message-ID oder None}. Scheitert schon der Upload, wird PublishError geworfen.
+    """
+    chat_ids = chat_ids or get_telegram_chat_ids()
+    if not chat_ids:
+        raise PublishError("Telegram Secrets (Token oder Chat ID) fehlen!", retryable=False)
+
+    first_chat, other_chats = chat_ids[0], chat_ids[1:]
+    first_message_id, file_id = _send_photo(first_chat, caption, image_path=image_path)
+    results = {first_chat: first_message_id}
+
+    if other_chats:
+        # Das globale Bot-Limit (ca. 30 Nachrichten/s) hält der Rate Limiter des HTTP-Clients ein
+        with ThreadPoolExecutor(max_workers=min(len(other_chats), MAX_PARALLEL_CHATS)) as pool:
+            futures = {chat_id: pool.submit(_send_photo, chat_id, caption, file_id=file_id) for chat_id in other_chats}
+            for chat_id, future in futures.items():
+                try:
+                    results[chat_id] = future.result()[0]
+                except PublishError as e:
+                    print(f"⚠️ {e}")
+                    results[chat_id] = None
+
+    reached = sum(1 for message_id in results.values() if message_id is not None)
+    print(f"📣 Telegram: {reached}/{len(chat_ids)} Chats erreicht (1 Upload, {len(other_chats)}x file_id)")
+    return results
+
+
+def _send_media_group(chat_id, items, file_ids=None):
+    """
+    Ein sendMediaGroup-Aufruf für 2-10 Bilder: items = [(Bildpfad, Bildunterschrift), ...].
+    Mit file_ids werden bereits hochgeladene Bilder wiederverwendet. Gibt ([Message-IDs], [file_ids]) zurück.
+    """
+    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
+    if not bot_token or not chat_id:
+        raise PublishError("Telegram Secrets (Token oder Chat ID) fehlen!", retryable=False)
+
+    url = f"https://api.telegram.org/bot{bot_token}/sendMediaGroup"
+
+    try:
+        with ExitStack() as stack:
+            media, files = [], {}
+            for i, (image_path, caption) in enumerate(items):
+                entry = {"type": "photo", "caption": _clip_caption(caption)}
+                if file_ids:
+                    entry["media"] = file_ids[i]
+                else:
+                    # Die Bilder selbst hängen als Multipart-Dateien an ("attach://<name>")
+                    entry["media"] = f"attach://photo{i}"
+                    files[f"photo{i}"] = stack.enter_context(open(image_path, 'rb'))
+                media.append(entry)
+
+            payload = {"chat_id": chat_id, "media": json.dumps(media)}
+            response = http_post(url, data=payload, files=files or None, timeout=TELEGRAM_TIMEOUT * 2)
+    except OSError as e:
+        raise PublishError(f"Verbindung zu Telegram fehlgeschlagen: {e}")
+
+    if response.status_code == 200:
+        messages = response.json()["result"]
+        return [m["message_id"] for m in messages], [m["photo"][-1]["file_id"] for m in messages]
+
+    retryable = response.status_code == 429 or response.status_code >= 500
+    raise PublishError(f"Telegram API Fehler ({chat_id}): {response.text}", retryable=retryable)
+
+def _send_album(chat_id, items, file_ids=None):
+    """Verschickt beliebig viele Bilder als Alben zu je max. 10 Stück. Gibt ([Message-IDs], [file_ids]) zurück."""
+    # Gleichmäßig aufteilen (11 Bilder -> 6 + 5 statt 10 + 1), da ein Album mind. 2 Bilder braucht
+    chunk_count = -(-len(items) // TELEGRAM_ALBUM_LIMIT)
+    chunk_size = -(-len(items) // chunk_count)
+
+    message_ids, new_file_ids = [], []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        chunk_ids = file_ids[start:start + chunk_size] if file_ids else None
+
+        if len(chunk) == 1:
+            # Nur bei genau einem Bild: als normales Foto senden
+            image_path, caption = chunk[0]
+            message_id, file_id = _send_photo(chat_id, caption, image_path=image_path,
+                                              file_id=chunk_ids[0] if chunk_ids else None)
+            chunk_message_ids, chunk_file_ids = [message_id], [file_id]
+        else:
+            chunk_message_ids, chunk_file_ids = _send_media_group(chat_id, chunk, chunk_ids)
+
+        message_ids += chunk_message_ids
+        new_file_ids += chunk_file_ids
+    return message_ids, new_file_ids
+
+def broadcast_telegram_album(items, chat_ids=None):
+    """
+    Verschickt mehrere Grafiken (items = [(Bildpfad, Bildunterschrift), ...]) als Album(s) an alle Chats.
+    Wie bei broadcast_telegram_photo wird nur für den ersten Chat hochgeladen, alle weiteren bekommen die file_ids.
+    Liefert {Chat-ID: [Message-IDs] oder None}.
+    """
+    chat_ids = chat_ids or get_telegram_chat_ids()
+    if not chat_ids:
+        raise PublishError("Telegram Secrets (Token oder Chat ID) fehlen!", retryable=False)
+
+    first_chat, other_chats = chat_ids[0], chat_ids[1:]
+    first_message_ids, file_ids = _send_album(first_chat, items)
+    results = {first_chat: first_message_ids}
+
+    if other_chats:
+        with ThreadPoolExecutor(max_workers=min(len(other_chats), MAX_PARALLEL_CHATS)) as pool:
+            futures = {chat_id: pool.submit(_send_album, chat_id, items, file_ids) for chat_id in other_chats}
+            for chat_id, future in futures.items():
+                try:
+                    results[chat_id] = future.result()[0]
+                except PublishError as e:
+                    print(f"⚠️ {e}")
+                    results[chat_id] = None
+
+    requests_per_chat = -(-len(items) // TELEGRAM_ALBUM_LIMIT)
+    reached = sum(1 for message_ids in results.values() if message_ids is not None)
+    print(f"🖼️ Telegram-Album: {len(items)} Grafiken in {requests_per_chat} Anfrage(n) pro Chat, {reached}/{len(chat_ids)} Chats erreicht")
+    return results
+
+
+_twitter_clients = None
+_twitter_lock = threading.Lock()
+
+def _get_twitter_clients():
+    """Baut die Twitter-Clients einmal pro Prozess und verwendet sie danach wieder."""
+    global _twitter_clients
+    with _twitter_lock:
+        if _twitter_clients is None:
+            # Secrets laden
+            api_key = os.getenv("TWITTER_API_KEY")
+            api_secret = os.getenv("TWITTER_API_SECRET")
+            access_token = os.getenv("TWITTER_ACCESS_TOKEN")
+            access_secret = os.getenv("TWITTER_ACCESS_SECRET")
+
+            if not all([api_key, api_secret, access_token, access_secret]):
+                raise PublishError("Twitter Secrets fehlen!", retryable=False)
+
+            # 1. Authentifizierung für den Medien-Upload (benötigt die alte v1.1 API)
+            auth = tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret)
+            api_v1 = tweepy.API(auth, timeout=TWITTER_TIMEOUT)
+
+            # 2. Authentifizierung für den Tweet selbst (neue v2 API)
+            client = tweepy.Client(
+                consumer_key=api_key,
+                consumer_secret=api_secret,
+                access_token=access_token,
+                access_token_secret=access_secret
+            )
+
+            _twitter_clients = (api_v1, client)
+        return _twitter_clients
+
+def send_tweet(image_path, caption):
+    """Sendet ein Bild mit Text an Twitter/X und gibt die Tweet-ID zurück (wirft PublishError)."""
+    api_v1, client = _get_twitter_clients()
 
-def post_to_twitter(image_path, caption):
-    """Sendet ein Bild mit Text an Twitter/X."""
-    print("🐦 Bereite Twitter-Post vor...")
-    
-    # Secrets laden
-    api_key = os.getenv("TWITTER_API_KEY")
-    api_secret = os.getenv("TWITTER_API_SECRET")
-    access_token = os.getenv("TWITTER_ACCESS_TOKEN")
-    access_secret = os.getenv("TWITTER_ACCESS_SECRET")
-    
-    if not all([api_key, api_secret, access_token, access_secret]):
-        print("❌ Fehler: Twitter Secrets fehlen!")
-        return False
-        
     try:
-        # 1. Authentifizierung für den Medien-Upload (benötigt die alte v1.1 API)
-        auth = tweepy.OAuth1UserHandler(api_key, api_secret, access_token, access_secret)
-        api_v1 = tweepy.API(auth)
-        
-        # 2. Authentifizierung für den Tweet selbst (neue v2 API)
-        client = tweepy.Client(
-            consumer_key=api_key,
-            consumer_secret=api_secret,
-            access_token=access_token,
-            access_token_secret=access_secret
-        )
-        
         # Bild hochladen
         print("⏳ Lade Bild auf Twitter hoch...")
         media = api_v1.media_upload(image_path)
-        
+
         # Tweet mit Bild senden
         print("⏳ Sende Tweet...")
         response = client.create_tweet(text=caption, media_ids=[media.media_id])
-        
-        print(f"✅ Erfolgreich getwittert! Tweet ID: {response.data['id']}")
+        return response.data['id']
+
+    except (tweepy.errors.TooManyRequests, tweepy.errors.TwitterServerError) as e:
+        raise PublishError(f"Twitter vorübergehend nicht verfügbar: {e}")
+    except tweepy.errors.HTTPException as e:
+        # Auth-Fehler, doppelter Tweet, zu langer Text: ein neuer Versuch hilft nicht
+        raise PublishError(f"Twitter API Fehler: {e}", retryable=False)
+    except tweepy.errors.TweepyException as e:
+        raise PublishError(f"Verbindung zu Twitter fehlgeschlagen: {e}")
+
+
+def post_to_telegram(image_path, caption):
+    """Sendet ein Bild mit Text an alle konfigurierten Telegram-Chats."""
+    print("📲 Bereite Telegram-Post vor...")
+    try:
+        broadcast_telegram_photo(image_path, caption)
+        print("✅ Erfolgreich an Telegram gesendet!")
+        return True
+    except PublishError as e:
+        print(f"❌ Fehler beim Senden an Telegram: {e}")
+        return False
+
+
+def post_to_twitter(image_path, caption):
+    """Sendet ein Bild mit Text an Twitter/X."""
+    print("🐦 Bereite Twitter-Post vor...")
+    try:
+        tweet_id = send_tweet(image_path, caption)
+        print(f"✅ Erfolgreich getwittert! Tweet ID: {tweet_id}")
         return True
-        
-    except Exception as e:
+    except PublishError as e:
         print(f"❌ Fehler beim Twittern: {e}")
         return False
@@ -1,98 +1,327 @@
+import io
 import os
+import re
+import uuid
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
-import pandas as pd
+from matplotlib.figure import Figure
+
+from .downsample import downsample_series
+from .render_cache import chart_cache_key, render_cache
+
+# ==========================================
+# GEMEINSAMES DESIGN
+# ==========================================
+# Bei jeder sichtbaren Design-Änderung erhöhen, damit der Render-Cache keine alten Grafiken liefert
+STYLE_VERSION = 3
+
+BG_COLOR = '#15202b'
+GRID_COLOR = '#38444d'
+TICK_COLOR = '#8899a6'
+BLUE = '#1DA1F2'   # Twitter-Blau
+GOLD = '#FFD700'
+
+# Diese Einheiten hängen direkt an der Zahl ("4.2%", "21.5°C"), alle anderen mit Leerzeichen ("1.0850 $")
+ATTACHED_UNITS = ("%", "°C")
+
+def unit_suffix(unit):
+    """Einheit der TimeSeries als Anhang für Zahlenwerte."""
+    if not unit:
+        return ""
+    return unit if unit in ATTACHED_UNITS else f" {unit}"
+
+def format_peak(max_views):
+    """Formatiert den Höchstwert je nach Größenordnung."""
+    if max_views < 10:
+        return f"{max_views:.4f}"
+    elif max_views < 100:
+        return f"{max_views:.1f}"
+    else:
+        return f"{int(max_views):,}".replace(',', '.')
+
+def _pixel_width(fig):
+    """Breite der Grafik in Pixeln: mehr Punkte pro Linie kann das Bild ohnehin nicht darstellen."""
+    return int(fig.get_figwidth() * fig.dpi)
+
+def _style_axes(fig, ax):
+    """Hintergrund, Gitter, Rahmen und Datumsachse – identisch für alle Diagramme."""
+    fig.patch.set_facecolor(BG_COLOR)
+    ax.set_facecolor(BG_COLOR)
+    ax.grid(color=GRID_COLOR, linestyle='--', linewidth=0.5, alpha=0.7)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d. %b'))
+    ax.tick_params(axis='x', labelrotation=45, labelcolor=TICK_COLOR)
+    for spine in ax.spines.values():
+        spine.set_color(GRID_COLOR)
+
+def _layout_and_save(fig, chart_path, **savefig_kwargs):
+    """
+    tight_layout rechnet vom aktuellen Layout aus weiter. Damit ein wiederverwendetes Template
+    immer exakt dieselbe Grafik liefert, starten wir jedes Mal von den Standard-Rändern.
+    """
+    fig.subplots_adjust(**{key: plt.rcParams[f'figure.subplot.{key}'] for key in ('left', 'right', 'bottom', 'top')})
+    fig.tight_layout()
+    fig.savefig(chart_path, facecolor=fig.get_facecolor(), edgecolor='none', **savefig_kwargs)
+
+# ==========================================
+# TEMPLATE 1: STANDARD LINIENDIAGRAMM
+# ==========================================
+class TrendChartTemplate:
+    """
+    Vorgestyltes Liniendiagramm: Figure, Farben, Gitter, Rahmen und Formatierer werden nur EINMAL aufgebaut.
+    Pro Grafik werden danach nur noch Linien, Fläche, Peak-Markierung und Titel ausgetauscht.
+    """
+
+    def __init__(self):
+        with plt.style.context('dark_background'):
+            # Objektorientierte Figure statt pyplot: kein globaler Zustand, kein plt.close nötig
+            self.fig = Figure(figsize=(10, 6), dpi=300)
+            self.ax = self.fig.subplots()
+            _style_axes(self.fig, self.ax)
+            self.ax.tick_params(axis='y', labelcolor=TICK_COLOR)
+
+            self.title = self.ax.set_title('', color='white', fontsize=16, fontweight='bold', pad=15)
+            self.peak = self.ax.annotate('', xy=(0, 0),
+                                         xytext=(10, 20),
+                                         textcoords='offset points',
+                                         color='white',
+                                         fontweight='bold',
+                                         arrowprops=dict(arrowstyle="->", color=GOLD, lw=1.5))
+
+        # Linien und Fläche entstehen beim ersten Rendern (dann kennt die X-Achse ihre Datums-Einheit)
+        self.daily_line = None
+        self.trend_line = None
+        self.fill = None
+
+    def render(self, ts, thema, source_name, y_label, chart_path):
+        """Tauscht die Daten (TimeSeries) im Template aus und speichert die Grafik unter chart_path."""
+        ax = self.ax
+        thema_clean = thema.replace('_', ' ')
+
+        values = ts.series
+        trend = values.rolling(window=7, min_periods=1).mean()
+
+        max_views = values.max()
+        max_date = values.idxmax()
+        min_val = values.min()
+
+        # Lange Zeitreihen (Jahre, stündliche Daten) nur mit so vielen Punkten zeichnen, wie die Grafik Pixel breit ist.
+        # Kennzahlen und Trend kommen oben aus den vollständigen Daten, der Peak bleibt beim Ausdünnen erhalten.
+        max_points = _pixel_width(self.fig)
+        values = downsample_series(values, max_points)
+        # Trend an denselben Tagen wie die Tageswerte, sonst landen seine Punkte auf falschen Daten
+        trend = trend.loc[values.index]
+
+        with plt.style.context('dark_background'):
+            # Dynamische Y-Achse berechnen (damit kleine Schwankungen sichtbar werden)
+            padding = (max_views - min_val) * 0.2
+            if padding == 0: padding = min_val * 0.05
+
+            lower_bound = min_val - padding
+            upper_bound = max_views + padding
+
+            # Linien und Flächen austauschen
+            if self.fill is not None:
+                self.fill.remove()
+            self.fill = ax.fill_between(values.index, values, lower_bound, color=BLUE, alpha=0.2)
+
+            if self.daily_line is None:
+                self.daily_line, = ax.plot(values.index, values, color=BLUE, linewidth=1.5, alpha=0.5)
+                self.trend_line, = ax.plot(values.index, trend, color=GOLD, linewidth=3, label='7-Tage Trend')
+            else:
+                self.daily_line.set_data(values.index, values)
+                self.trend_line.set_data(values.index, trend)
+                ax.relim()
+                ax.autoscale_view(scaley=False)
+
+            self.daily_line.set_label(f'Tägliche {y_label}')
+            ax.set_ylim(lower_bound, upper_bound)
+            ax.legend(loc='upper left', facecolor=BG_COLOR, edgecolor=GRID_COLOR, labelcolor='white')
+
+            # Den Höchstwert markieren (Pfeil & Text)
+            self.peak.xy = (max_date, max_views)
+            self.peak.set_text(f'Peak: {format_peak(max_views)}{unit_suffix(ts.unit)}')
+
+            self.title.set_text(f'{source_name} Trend: {thema_clean}')
+
+            _layout_and_save(self.fig, chart_path)
+
+        return chart_path
+
+# ==========================================
+# TEMPLATE 2: CROSSOVER DIAGRAMM (2 ACHSEN)
+# ==========================================
+class CorrelationChartTemplate:
+    """
+    Vorgestyltes Diagramm mit ZWEI Y-Achsen. Beide Achsen, Farben und Rahmen werden nur einmal aufgebaut,
+    pro Grafik werden nur Linien, Achsenbeschriftungen und Titel ausgetauscht.
+    """
+
+    def __init__(self):
+        with plt.style.context('dark_background'):
+            self.fig = Figure(figsize=(10, 6), dpi=300)
+            self.ax1 = self.fig.subplots()
+            _style_axes(self.fig, self.ax1)
+
+            # ERSTE Y-ACHSE (Linke Seite, z.B. Bitcoin)
+            self.ax1.tick_params(axis='y', labelcolor=BLUE)
+
+            # ZWEITE Y-ACHSE (Rechte Seite, z.B. Zinsen)
+            self.ax2 = self.ax1.twinx()  # Magie: Zweite Achse erstellen
+            self.ax2.tick_params(axis='y', labelcolor=GOLD)
+            for spine in self.ax2.spines.values(): spine.set_color(GRID_COLOR)
+
+            self.title = self.ax1.set_title('', color='white', fontsize=16, fontweight='bold', pad=15)
+
+        self.line1 = None
+        self.line2 = None
+
+    def render(self, ts_1, ts_2, title, label_1, label_2, chart_path):
+        """Legt beide TimeSeries auf die gemeinsamen Tage, tauscht die Daten aus und speichert unter chart_path."""
+        df = ts_1.align(ts_2, 'Wert1', 'Wert2')
+        # Jede Linie für sich auf die Pixelbreite ausdünnen (nur bei langen Zeitreihen)
+        points = {column: downsample_series(df[column], _pixel_width(self.fig)) for column in ('Wert1', 'Wert2')}
+
+        with plt.style.context('dark_background'):
+            self.ax1.set_ylabel(label_1, color=BLUE, fontweight='bold')
+            self.ax2.set_ylabel(label_2, color=GOLD, fontweight='bold')
+
+            if self.line1 is None:
+                self.line1, = self.ax1.plot(points['Wert1'].index, points['Wert1'], color=BLUE, linewidth=2.5)
+                self.line2, = self.ax2.plot(points['Wert2'].index, points['Wert2'], color=GOLD, linewidth=2.5, linestyle='-')
+            else:
+                for ax, line, column in [(self.ax1, self.line1, 'Wert1'), (self.ax2, self.line2, 'Wert2')]:
+                    line.set_data(points[column].index, points[column])
+                    ax.relim()
+                    ax.autoscale_view()
+
+            self.line1.set_label(label_1)
+            self.line2.set_label(label_2)
+            self.title.set_text(title)
+
+            # Legenden zusammenführen
+            lines = [self.line1, self.line2]
+            labels = [l.get_label() for l in lines]
+            self.ax1.legend(lines, labels, loc='upper center', bbox_to_anchor=(0.5, -0.15),
+                            ncol=2, facecolor=BG_COLOR, edgecolor=GRID_COLOR, labelcolor='white')
+
+            _layout_and_save(self.fig, chart_path, bbox_inches="tight")
+
+        return chart_path
+
+# Die Templates werden beim ersten Gebrauch gebaut und danach wiederverwendet (pro Prozess).
+# Eine Figure darf nicht gleichzeitig von zwei Threads bearbeitet werden, daher der Lock.
+_templates = {}
+_render_lock = threading.Lock()
+
+def _get_template(template_class):
+    if template_class not in _templates:
+        _templates[template_class] = template_class()
+    return _templates[template_class]
+
+# ==========================================
+# RENDERN EINER GRAFIK-SPEZIFIKATION
+# ==========================================
+OUTPUT_DIR = "output"
+
+def unique_chart_path(kind, name):
+    """Eindeutiger Dateiname pro Grafik, damit sich parallel gerenderte Grafiken nicht überschreiben."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')[:40] or kind
+    return os.path.join(OUTPUT_DIR, f"{kind}_{slug}_{uuid.uuid4().hex[:8]}.png")
+
+def render_chart(spec):
+    """
+    Rendert eine Grafik-Spezifikation (Dictionary) mit dem passenden Template:
+      - kind="trend":       series (TimeSeries), thema, source_name, y_label
+      - kind="correlation": series_1, series_2 (TimeSeries), title, label_1, label_2
+    Optional: chart_path (fester Pfad) oder as_buffer=True (liefert die PNG-Bytes statt eines Pfads).
+    Identische Eingaben kommen direkt aus dem Render-Cache, ohne matplotlib anzufassen.
+    """
+    kind = spec["kind"]
+    if kind == "trend":
+        template_class = TrendChartTemplate
+        name = spec["thema"]
+        source_name, y_label = spec.get("source_name", "Wikipedia"), spec.get("y_label", "Aufrufe")
+        args = (spec["series"], spec["thema"], source_name, y_label)
+        data = spec["series"].series
+        labels = {"thema": spec["thema"], "source_name": source_name, "y_label": y_label, "unit": spec["series"].unit}
+    elif kind == "correlation":
+        template_class = CorrelationChartTemplate
+        name = spec["title"]
+        args = (spec["series_1"], spec["series_2"], spec["title"], spec["label_1"], spec["label_2"])
+        data = spec["series_1"].align(spec["series_2"], 'Wert1', 'Wert2')
+        labels = {"title": spec["title"], "label_1": spec["label_1"], "label_2": spec["label_2"]}
+    else:
+        raise ValueError(f"Unbekannter Diagramm-Typ: {kind}")
+
+    cache_key = chart_cache_key(kind, data, STYLE_VERSION, **labels)
+    png_bytes = render_cache.get(cache_key)
+
+    if png_bytes is not None:
+        print(f"♻️ Grafik '{name}' unverändert, nutze gerenderte Version aus dem Cache.")
+    else:
+        buffer = io.BytesIO()
+        with _render_lock:
+            _get_template(template_class).render(*args, buffer)
+        png_bytes = buffer.getvalue()
+        render_cache.put(cache_key, png_bytes)
+
+    if spec.get("as_buffer"):
+        return png_bytes
+
+    chart_path = spec.get("chart_path") or unique_chart_path(kind, name)
+    os.makedirs(os.path.dirname(chart_path) or ".", exist_ok=True)
+    with open(chart_path, 'wb') as f:
+        f.write(png_bytes)
+    return chart_path
+
+def _render_chart_safe(spec):
+    """Wie render_chart, aber ein Fehler betrifft nur diese eine Grafik (läuft im Worker-Prozess)."""
+    try:
+        return render_chart(spec)
+    except Exception as e:
+        print(f"❌ Fehler bei der Grafikerstellung ({spec.get('kind')}): {e}")
+        return None
+
+def render_charts(specs, max_workers=None):
+    """
+    Rendert mehrere Grafiken parallel in einem Prozess-Pool (ein Template pro Worker-Prozess).
+    Liefert die Pfade (bzw. PNG-Bytes) in derselben Reihenfolge wie specs, None für fehlgeschlagene Grafiken.
+    """
+    if not specs:
+        return []
+
+    workers = min(len(specs), max_workers or os.cpu_count() or 1)
+    print(f"🎨 Rendere {len(specs)} Grafik(en) auf {workers} Prozess(en)...")
+
+    # Für eine einzelne Grafik lohnt sich der Start eines Prozess-Pools nicht
+    if workers == 1:
+        return [_render_chart_safe(spec) for spec in specs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_chart_safe, specs))
 
 # ==========================================
 # FUNKTION 1: STANDARD LINIENDIAGRAMM
 # ==========================================
-def create_trend_chart(df, thema, source_name="Wikipedia", y_label="Aufrufe"):
+def create_trend_chart(ts, thema, source_name="Wikipedia", y_label="Aufrufe", chart_path=None):
     """
     Erstellt ein ansprechendes Liniendiagramm mit Trendlinie und Höchstwert-Markierung.
     Wird für isolierte Datensätze (z.B. nur NASA oder nur Wetter) genutzt.
+    Ohne chart_path wird ein eindeutiger Dateiname im Ordner output/ gewählt.
     """
     print(f"🎨 Generiere professionelle Grafik für {source_name}...")
-    
-    os.makedirs("output", exist_ok=True)
-    chart_path = "output/trend_chart.png"
-    
+
     try:
-        # 1. Daten und Basis-Setup vorbereiten
-        thema_clean = thema.replace('_', ' ')
-        if 'timestamp' in df.columns:
-            df = df.set_index('timestamp')
-            
-        df['Trend'] = df['Aufrufe'].rolling(window=7, min_periods=1).mean()
-        
-        max_views = df['Aufrufe'].max()
-        max_date = df['Aufrufe'].idxmax()
-
-        # 2. Design & Farben
-        plt.style.use('dark_background')
-        fig, ax = plt.subplots(figsize=(10, 6), dpi=300)
-        
-        bg_color = '#15202b'
-        fig.patch.set_facecolor(bg_color)
-        ax.set_facecolor(bg_color)
-        ax.grid(color='#38444d', linestyle='--', linewidth=0.5, alpha=0.7)
-
-        # 3. Dynamische Y-Achse berechnen (damit kleine Schwankungen sichtbar werden)
-        min_val = df['Aufrufe'].min()
-        max_val = df['Aufrufe'].max()
-        padding = (max_val - min_val) * 0.2 
-        
-        if padding == 0: padding = min_val * 0.05 
-        
-        lower_bound = min_val - padding
-        upper_bound = max_val + padding
-        ax.set_ylim(lower_bound, upper_bound)
-
-        # 4. Linien und Flächen zeichnen
-        ax.fill_between(df.index, df['Aufrufe'], lower_bound, color='#1DA1F2', alpha=0.2)
-        ax.plot(df.index, df['Aufrufe'], color='#1DA1F2', linewidth=1.5, alpha=0.5, label=f'Tägliche {y_label}')
-        ax.plot(df.index, df['Trend'], color='#FFD700', linewidth=3, label='7-Tage Trend')
-        
-        ax.legend(loc='upper left', facecolor=bg_color, edgecolor='#38444d', labelcolor='white')
-
-        # 5. Den Höchstwert markieren (Pfeil & Text)
-        if max_views < 10:
-            max_views_str = f"{max_views:.4f}" 
-        elif max_views < 100:
-            max_views_str = f"{max_views:.1f}" 
-        else:
-            max_views_str = f"{int(max_views):,}".replace(',', '.') 
-            
-        # Die passende Einheit zum Modul finden
-        unit = ""
-        if source_name == "Makro/FRED": unit = "%"
-        elif source_name == "Umwelt/DWD": unit = "°C"
-        elif source_name in ["EZB", "Krypto"]: unit = " $"
-            
-        # Hänge die Einheit direkt an den Peak-String an
-        ax.annotate(f'Peak: {max_views_str}{unit}',
-                    xy=(max_date, max_views),
-                    xytext=(10, 20), 
-                    textcoords='offset points',
-                    color='white',
-                    fontweight='bold',
-                    arrowprops=dict(arrowstyle="->", color='#FFD700', lw=1.5))
-
-        # 6. Beschriftungen und Achsen formatieren
-        plt.title(f'{source_name} Trend: {thema_clean}', color='white', fontsize=16, fontweight='bold', pad=15)
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d. %b'))
-        plt.xticks(rotation=45, color='#8899a6')
-        plt.yticks(color='#8899a6')
-        
-        for spine in ax.spines.values():
-            spine.set_color('#38444d')
-
-        plt.tight_layout()
-        plt.savefig(chart_path, facecolor=fig.get_facecolor(), edgecolor='none')
-        plt.close()
-        
+        chart_path = render_chart({
+            "kind": "trend", "series": ts, "thema": thema,
+            "source_name": source_name, "y_label": y_label, "chart_path": chart_path,
+        })
+
         print(f"✅ Grafik erfolgreich gespeichert unter: {chart_path}")
         return chart_path
-        
+
     except Exception as e:
         print(f"❌ Fehler bei der Grafikerstellung: {e}")
         return None
@@ -100,63 +329,23 @@ def create_trend_chart(df, thema, source_name="Wikipedia", y_label="Aufrufe"):
 # ==========================================
 # FUNKTION 2: CROSSOVER DIAGRAMM (2 ACHSEN)
 # ==========================================
-def create_correlation_chart(df, title, label_1, label_2):
+def create_correlation_chart(ts_1, ts_2, title, label_1, label_2, chart_path=None):
     """
     Erstellt ein Diagramm mit ZWEI Y-Achsen, um zwei Datensätze zu vergleichen.
-    Erwartet einen DataFrame mit den Spalten 'timestamp', 'Wert1' und 'Wert2'.
+    Erwartet zwei TimeSeries; gezeichnet werden nur die Tage, die in beiden vorkommen.
+    Ohne chart_path wird ein eindeutiger Dateiname im Ordner output/ gewählt.
     """
     print(f"🎨 Generiere Crossover-Grafik: {title}...")
-    
-    os.makedirs("output", exist_ok=True)
-    chart_path = "output/correlation_chart.png"
-    
+
     try:
-        # 1. Basis-Setup
-        if 'timestamp' in df.columns:
-            df = df.set_index('timestamp')
-
-        plt.style.use('dark_background')
-        fig, ax1 = plt.subplots(figsize=(10, 6), dpi=300)
-        
-        bg_color = '#15202b'
-        fig.patch.set_facecolor(bg_color)
-        ax1.set_facecolor(bg_color)
-        ax1.grid(color='#38444d', linestyle='--', linewidth=0.5, alpha=0.7)
-
-        # 2. ERSTE Y-ACHSE (Linke Seite, z.B. Bitcoin)
-        color1 = '#1DA1F2' # Twitter-Blau
-        ax1.set_ylabel(label_1, color=color1, fontweight='bold')
-        line1 = ax1.plot(df.index, df['Wert1'], color=color1, linewidth=2.5, label=label_1)
-        ax1.tick_params(axis='y', labelcolor=color1)
-
-        # 3. ZWEITE Y-ACHSE (Rechte Seite, z.B. Zinsen)
-        ax2 = ax1.twinx()  # Magie: Zweite Achse erstellen
-        color2 = '#FFD700' # Gold
-        ax2.set_ylabel(label_2, color=color2, fontweight='bold')
-        line2 = ax2.plot(df.index, df['Wert2'], color=color2, linewidth=2.5, linestyle='-', label=label_2)
-        ax2.tick_params(axis='y', labelcolor=color2)
-
-        # 4. Design & Layout
-        plt.title(title, color='white', fontsize=16, fontweight='bold', pad=15)
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%d. %b'))
-        plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, color='#8899a6')
-        
-        for spine in ax1.spines.values(): spine.set_color('#38444d')
-        for spine in ax2.spines.values(): spine.set_color('#38444d')
-
-        # 5. Legenden zusammenführen
-        lines = line1 + line2
-        labels = [l.get_label() for l in lines]
-        ax1.legend(lines, labels, loc='upper center', bbox_to_anchor=(0.5, -0.15), 
-                   ncol=2, facecolor=bg_color, edgecolor='#38444d', labelcolor='white')
-
-        plt.tight_layout()
-        plt.savefig(chart_path, facecolor=fig.get_facecolor(), edgecolor='none', bbox_inches="tight")
-        plt.close()
-        
+        chart_path = render_chart({
+            "kind": "correlation", "series_1": ts_1, "series_2": ts_2, "title": title,
+            "label_1": label_1, "label_2": label_2, "chart_path": chart_path,
+        })
+
         print(f"✅ Crossover-Grafik erfolgreich gespeichert unter: {chart_path}")
         return chart_path
-        
+
     except Exception as e:
         print(f"❌ Fehler bei der Crossover-Grafikerstellung: {e}")
         return None
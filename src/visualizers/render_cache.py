@@ -0,0 +1,85 @@
+import os
+import uuid
+import hashlib
+import pandas as pd
+
+# Bewusst außerhalb von data/ (Zeitreihen-Speicher): In GitHub Actions sichert der Workflow diesen Ordner
+# mit einem eigenen, kleinen Cache (CHART_CACHE_MAX_MB), damit Grafiken auch über Läufe hinweg wiederverwendet werden.
+CACHE_DIR = os.getenv("CHART_CACHE_DIR", ".cache/charts")
+
+# Maximale Gesamtgröße aller gespeicherten PNGs, danach fliegen die am längsten ungenutzten raus
+MAX_CACHE_BYTES = int(os.getenv("CHART_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+def chart_cache_key(kind, data, style_version, **params):
+    """
+    Inhaltsbasierter Schlüssel: Hash über die Datenwerte, alle Beschriftungen/Einheiten und die Design-Version.
+    Gleiche Eingaben ergeben garantiert dieselbe Grafik, also denselben Schlüssel.
+    """
+    h = hashlib.sha256()
+    h.update(f"{kind}|style={style_version}".encode())
+    for name in sorted(params):
+        h.update(f"|{name}={params[name]!r}".encode())
+
+    # data: Series (eine Zeitreihe) oder DataFrame (mehrere Zeitreihen auf gemeinsamen Tagen)
+    columns = list(data.columns) if isinstance(data, pd.DataFrame) else []
+    h.update("|columns=".encode() + repr(columns).encode())
+    h.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    return h.hexdigest()
+
+class RenderCache:
+    """PNG-Cache auf der Festplatte mit größenbegrenzter LRU-Verdrängung (nach letzter Nutzung)."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, key):
+        """Liefert die PNG-Bytes zum Schlüssel oder None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        # Zeitstempel auffrischen = "zuletzt genutzt" für die LRU-Verdrängung
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """Speichert PNG-Bytes. Atomar über eine temporäre Datei, da mehrere Prozesse gleichzeitig schreiben können."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        """Löscht die am längsten ungenutzten PNGs, bis der Cache wieder unter max_bytes liegt."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.png'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+render_cache = RenderCache()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests importieren die Module wie das Dashboard über das Paket "src"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.correlation import correlation_report, most_interesting_pair
+from src.extractors.timeseries import TimeSeries
+
+DAYS = pd.date_range("2024-03-01", periods=31, freq="D")
+WEEKDAYS = DAYS[DAYS.dayofweek < 5]
+
+def _random_walks(seed):
+    """Fünf unabhängige Irrfahrten wie im CROSSOVER-Modul (Zinsen und Wechselkurs nur werktags)."""
+    rng = np.random.default_rng(seed)
+    days = {"crypto": DAYS, "fred": WEEKDAYS, "weather": DAYS, "exchange": WEEKDAYS, "nasa": DAYS}
+    return {key: TimeSeries(pd.Series(100 + np.cumsum(rng.normal(size=len(index))), index=index)) for key, index in days.items()}
+
+def test_independent_random_walks_keep_default_pair():
+    replaced = sum(most_interesting_pair(correlation_report(_random_walks(seed))) is not None for seed in range(200))
+    assert replaced <= 5
+
+def test_related_changes_are_found():
+    series = _random_walks(0)
+    rng = np.random.default_rng(1)
+    changes = np.diff(series["fred"].series.to_numpy())
+    related = np.concatenate([[50], 50 + np.cumsum(2 * changes + rng.normal(scale=0.3, size=len(changes)))])
+    series["exchange"] = TimeSeries(pd.Series(related, index=WEEKDAYS))
+
+    pair = most_interesting_pair(correlation_report(series))
+    assert {pair["a"], pair["b"]} == {"fred", "exchange"}
+    assert pair["corr"] > 0.9
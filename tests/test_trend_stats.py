@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from src.analysis.trend_stats import STAT_COLUMNS, trend_stats
+from src.extractors.timeseries import TimeSeries
+
+def _series(values, start="2024-03-01"):
+    return TimeSeries(pd.Series(values, index=pd.date_range(start, periods=len(values), freq="D"), dtype="float64"))
+
+def test_single_day():
+    stats = trend_stats({"a": _series([5.0]), "b": _series([7.0])})
+    assert list(stats.columns) == STAT_COLUMNS
+    assert stats.loc["a", "last"] == 5.0
+    assert (stats["streak_days"] == 0).all() and (stats["streak_direction"] == 0).all()
+    assert stats[["change_7d", "wow_change", "slope_7d"]].isna().all().all()
+
+def test_two_days():
+    stats = trend_stats({"up": _series([1.0, 3.0]), "down": _series([4.0, 2.0])})
+    assert stats.loc["up", "streak_days"] == 1 and stats.loc["up", "streak_direction"] == 1
+    assert stats.loc["down", "streak_days"] == 1 and stats.loc["down", "streak_direction"] == -1
+    assert stats.loc["up", "slope_7d"] == 2.0
+    assert np.isnan(stats.loc["up", "change_7d"])
@@ -0,0 +1,54 @@
+import warnings
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.extractors.wikipedia_dumps import write_day
+from src.extractors.wikipedia_trends import MAX_DUMP_AGE_DAYS, find_spike_trend_from_dumps, score_spikes
+
+def _write_history(store_dir, last_day, days=15):
+    """Gleichmäßige Aufrufe und am letzten Tag ein deutlicher Ausreißer."""
+    for offset in range(days):
+        day = last_day - timedelta(days=days - 1 - offset)
+        spike = offset == days - 1
+        write_day("de", day, {"Ausreißer": 50000 if spike else 1000, "Dauerbrenner": 20000}, 24, str(store_dir))
+
+def _write_partial_day(store_dir, day, hours=5):
+    """Ein angebrochener Tag: alle Artikel mit nur einem Bruchteil ihrer Aufrufe, einer davon knapp über MIN_VIEWS."""
+    write_day("de", day, {"Ausreißer": 10000, "Dauerbrenner": 6000, "Frühaufsteher": 5500}, hours, str(store_dir))
+
+def test_recent_dumps_find_spike(tmp_path):
+    today = date(2024, 3, 10)
+    _write_history(tmp_path, today - timedelta(days=1))
+    assert find_spike_trend_from_dumps("de", store_dir=str(tmp_path), today=today) == "Ausreißer"
+
+def test_stale_dumps_fall_back_to_api(tmp_path):
+    today = date(2024, 3, 10)
+    _write_history(tmp_path, today - timedelta(days=MAX_DUMP_AGE_DAYS + 1))
+    assert find_spike_trend_from_dumps("de", store_dir=str(tmp_path), today=today) is None
+
+def test_partial_last_day_is_skipped(tmp_path):
+    today = date(2024, 3, 10)
+    _write_history(tmp_path, today - timedelta(days=2))
+    _write_partial_day(tmp_path, today - timedelta(days=1))
+    assert find_spike_trend_from_dumps("de", store_dir=str(tmp_path), today=today) == "Ausreißer"
+
+def test_partial_day_does_not_count_as_recent(tmp_path):
+    today = date(2024, 3, 10)
+    _write_history(tmp_path, today - timedelta(days=MAX_DUMP_AGE_DAYS + 1))
+    _write_partial_day(tmp_path, today - timedelta(days=1))
+    assert find_spike_trend_from_dumps("de", store_dir=str(tmp_path), today=today) is None
+
+def test_article_without_baseline_is_not_scored():
+    days = pd.date_range("2024-03-01", periods=15, freq="D")
+    views = pd.DataFrame({
+        "Neu": [np.nan] * 14 + [6000],
+        "Lücke": [np.nan] * 10 + [1000] * 4 + [8000],
+        "Ausreißer": [3000] * 14 + [12000],
+    }, index=days)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        scores = score_spikes(views)
+    assert scores.index[0] == "Ausreißer"
+    assert scores.loc[["Neu", "Lücke"], "score"].isna().all()